@@ -14,10 +14,10 @@ Manage the animals that visit our veterinarian
     # Check https://github.com/odoo/odoo/blob/15.0/odoo/addons/base/data/ir_module_category_data.xml
     # for the full list
     'category': 'Animals',
-    'version': '1.0',
+    'version': '1.1',
 
     # any module necessary for this one to work correctly
-    'depends': ['base','mail','contacts','product','account','account_accountant','stock'],
+    'depends': ['base','mail','contacts','product','account','account_accountant','stock','resource'],
 
     # always loaded
     'data': [
@@ -28,6 +28,7 @@ Manage the animals that visit our veterinarian
         'data/visit_sequence_data.xml',
         'data/treatment_product.xml',
         'data/vet_dashboard_data.xml',
+        'data/vet_cron_data.xml',
         'views/vet_dashboard_views.xml',
         'views/animal_views.xml',
         'views/animal_doctor_views.xml',
@@ -39,6 +40,12 @@ Manage the animals that visit our veterinarian
         'views/animal_invoice_views.xml',
         'views/animal_history.xml',
         'views/service_views.xml',
+        'views/owner_import_views.xml',
+        'views/payment_allocation_views.xml',
+        'views/vet_reconcile_log_views.xml',
+        'views/vet_perf_views.xml',
+        'views/vet_recompute_queue_views.xml',
+        'views/owner_aging_views.xml',
         'views/menu_vet_views.xml',
 
     ],
@@ -0,0 +1,85 @@
+import logging
+
+from odoo import api, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+IMAGE_VARIANTS = ['image_1024', 'image_512', 'image_256', 'image_128']
+
+# Local hour at which the timeless appointments of a day are placed
+DEFAULT_OPENING_HOUR = 9
+
+
+def migrate(cr, version):
+    """Drop the per-visit copies of animal images.
+
+    vet.animal.visit.animal_pic used to be a stored related image, so every
+    visit kept its own attachment. It now reads the animal's resized image.
+    """
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    attachments = env['ir.attachment'].search([
+        ('res_model', '=', 'vet.animal.visit'),
+        ('res_field', '=', 'animal_pic'),
+    ])
+    _logger.info("Removing %s duplicated visit image attachments", len(attachments))
+    # unlink() marks the filestore files for garbage collection
+    attachments.unlink()
+
+    _generate_image_variants(env)
+    _backfill_price_versions(env)
+    _schedule_existing_appointments(env)
+
+
+def _generate_image_variants(env, batch_size=200):
+    """Build the image.mixin variants of the animals that already have a picture.
+
+    The variants are attachment fields without a column, so the module update
+    never computes them for existing rows.
+    """
+    Animal = env['vet.animal'].with_context(active_test=False)
+    animals = Animal.search([('image_1920', '!=', False)])
+    _logger.info("Generating resized images for %s animals", len(animals))
+    for start in range(0, len(animals), batch_size):
+        batch = animals[start:start + batch_size]
+        for fname in IMAGE_VARIANTS:
+            env.add_to_compute(Animal._fields[fname], batch)
+        Animal.flush_model(IMAGE_VARIANTS)
+        env.invalidate_all()
+
+
+def _backfill_price_versions(env):
+    """Give every existing service its current price as the first price version."""
+    services = env['vet.service'].search([('price_version_ids', '=', False)])
+    _logger.info("Recording the current price of %s services as their first price version", len(services))
+    services._create_initial_price_versions()
+
+
+def _schedule_existing_appointments(env):
+    """Give the appointments created before timed slots a start and end.
+
+    Each doctor's appointments of a day are queued back to back from the
+    opening hour in the administrator's timezone, so they show in the
+    calendar without overlapping each other.
+    """
+    tz = env.ref('base.user_admin', raise_if_not_found=False).tz or 'UTC'
+    env.cr.execute("""
+        WITH slots AS (
+            SELECT id,
+                   (appointment_date + make_interval(hours => %s)) AT TIME ZONE %s AT TIME ZONE 'UTC'
+                   + make_interval(secs => 3600 * (
+                         SUM(COALESCE(NULLIF(duration, 0), 0.5)) OVER w - COALESCE(NULLIF(duration, 0), 0.5)
+                     )) AS start_datetime,
+                   COALESCE(NULLIF(duration, 0), 0.5) AS duration
+              FROM vet_animal_schedule
+             WHERE start_datetime IS NULL
+               AND appointment_date IS NOT NULL
+            WINDOW w AS (PARTITION BY doctor_id, appointment_date ORDER BY id)
+        )
+        UPDATE vet_animal_schedule a
+           SET start_datetime = s.start_datetime,
+               end_datetime = s.start_datetime + make_interval(secs => 3600 * s.duration),
+               duration = s.duration
+          FROM slots s
+         WHERE a.id = s.id
+    """, (DEFAULT_OPENING_HOUR, tz))
+    _logger.info("Scheduled %s existing appointments from %s:00 %s", env.cr.rowcount, DEFAULT_OPENING_HOUR, tz)
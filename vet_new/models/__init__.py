@@ -1,4 +1,6 @@
 from . import animal, animal_owner, animal_doctor, service
 from . import vet_animal_visit_line, animalvisit
 from . import animal_schedule, vet_dashboard, account_move
-from . import animal_history
\ No newline at end of file
+from . import animal_history, ir_sequence, owner_import, payment_allocation
+from . import vet_reconcile_log, vet_perf, vet_recompute_queue
+from . import owner_aging
\ No newline at end of file
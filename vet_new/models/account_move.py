@@ -1,5 +1,7 @@
 # models/account_move_inherit.py
 from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from collections import defaultdict
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -77,13 +79,46 @@ class AccountPayment(models.Model):
 
     def action_post(self):
         res = super(AccountPayment, self).action_post()
-        for payment in self:
-            invoices = payment.invoice_ids
-            if invoices and payment.move_id:
-                lines_to_reconcile = payment.move_id.line_ids | invoices.mapped('line_ids')
-                if lines_to_reconcile:
-                    try:
-                        lines_to_reconcile.reconcile()
-                    except Exception as e:
-                        _logger.warning("Reconciliation failed: %s", e)
+        self._reconcile_with_invoices()
         return res
+
+    def _reconcile_with_invoices(self):
+        """Reconcile posted payments with their invoices, one call per partner and account.
+
+        Open receivable/payable lines of all payments and their invoices are
+        grouped by (commercial partner, account), so posting many payments costs
+        one reconcile() per group. Failed groups are rolled back on their own
+        and recorded in vet.reconcile.log.
+        """
+        groups = defaultdict(lambda: self.env['account.move.line'])
+        group_payments = defaultdict(lambda: self.env['account.payment'])
+        for payment in self.filtered(lambda p: p.invoice_ids and p.move_id):
+            lines = (payment.move_id.line_ids | payment.invoice_ids.line_ids).filtered(
+                lambda l: not l.reconciled
+                and l.account_id.account_type in ('asset_receivable', 'liability_payable')
+            )
+            for line in lines:
+                key = (line.partner_id.commercial_partner_id, line.account_id)
+                groups[key] |= line
+                group_payments[key] |= payment
+
+        failures = []
+        for (partner, account), lines in groups.items():
+            if len(lines) < 2:
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    lines.reconcile()
+            except Exception as e:
+                self.env.invalidate_all()
+                failures.append({
+                    'partner_id': partner.id,
+                    'account_id': account.id,
+                    'payment_ids': [(6, 0, group_payments[(partner, account)].ids)],
+                    'line_count': len(lines),
+                    'error': str(e),
+                })
+        if failures:
+            _logger.warning("Reconciliation failed for %s of %s partner/account group(s)", len(failures), len(groups))
+            self.env['vet.reconcile.log'].sudo().create(failures)
+        return failures
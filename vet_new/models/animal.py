@@ -1,15 +1,60 @@
-from odoo import fields, models, api
+from odoo import fields, models, api, tools
 from odoo.exceptions import ValidationError
+import calendar
 import logging
 from dateutil.relativedelta import relativedelta
 
+from .vet_perf import instrumented
+from .vet_recompute_queue import ANIMAL_RENAME_DEPENDENTS
+
 _logger = logging.getLogger(__name__)
 
+# Number of records recomputed per flush by the daily age refresh
+AGE_REFRESH_BATCH = 1000
+# Fields whose change can alter what vet.animal.owner.resolve_reception() finds
+RECEPTION_ANIMAL_FIELDS = {'owner_id', 'microchip_no', 'active'}
+
+
+def create_dob_day_index(cr, table):
+    """Index the day of month of dob, used to find records whose age label rolls over."""
+    tools.create_index(
+        cr, f'{table}_dob_day_idx', table,
+        ['(EXTRACT(DAY FROM dob))'], where='dob IS NOT NULL',
+    )
+
+
+def refresh_age_labels(model, today=None):
+    """Recompute the stored age of the records of model whose label changes today.
+
+    The "X years Y months" label only changes when a new month of age starts,
+    i.e. on the day of month of the birth date, or on the last day of a month
+    that is too short to have that day. Only those records (plus ones with no
+    age yet) are recomputed, in batches of AGE_REFRESH_BATCH.
+    """
+    today = today or fields.Date.today()
+    last_day = calendar.monthrange(today.year, today.month)[1]
+    day_condition = "EXTRACT(DAY FROM dob) >= %s" if today.day == last_day else "EXTRACT(DAY FROM dob) = %s"
+    model.flush_model(['dob', 'age'])
+    model.env.cr.execute(f"""
+        SELECT id FROM {model._table}
+         WHERE dob IS NOT NULL
+           AND ({day_condition} OR age IS NULL)
+    """, (today.day,))
+    ids = [row[0] for row in model.env.cr.fetchall()]
+    field = model._fields['age']
+    for batch_ids in tools.split_every(AGE_REFRESH_BATCH, ids):
+        records = model.browse(batch_ids)
+        model.env.add_to_compute(field, records)
+        records.flush_recordset(['age'])
+        model.env.invalidate_all()
+    _logger.info("Refreshed age of %s %s records", len(ids), model._name)
+    return len(ids)
+
 class VetAnimal(models.Model):
     _name = "vet.animal"
     _description = "Animal"
     _rec_name = "microchip_no"
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'image.mixin']
 
     _sql_constraints = [
         ('microchip_unique', 'unique(microchip_no)', 'Microchip number must be unique!')
@@ -20,12 +65,12 @@ class VetAnimal(models.Model):
         required=True,
         copy=False,
         readonly=True,
-        index=True,
+        index='trigram',
         default="New",
 
         tracking=True
     )
-    name = fields.Char(string="Name", required=True, tracking=True)
+    name = fields.Char(string="Name", required=True, tracking=True, index='trigram')
     dob = fields.Date(string="Date of Birth", tracking=True)
     age = fields.Char(string="Age", compute="_compute_age", store=True)
     gender = fields.Selection([('male', 'Male'), ('female', 'Female')], string="Gender", tracking=True)
@@ -33,8 +78,10 @@ class VetAnimal(models.Model):
     breed = fields.Char(string="Breed", tracking=True)
     owner_id = fields.Many2one('vet.animal.owner', string="Owner", tracking=True)
     contact_number = fields.Char(related='owner_id.contact_number', string="Owner Contact", store=True, readonly=True)
+    display_label = fields.Char(string="Display Label", compute="_compute_display_label", store=True)
 
-    # Use attachment_ids specifically for images
+    # Use attachment_ids specifically for images; image.mixin adds the resized
+    # image_1024/512/256/128 variants used by visits and kanban cards
     image_1920 = fields.Image(string="Animal Image", max_width=1920, max_height=1920)
 
     active = fields.Boolean(string="Active", default=True)
@@ -66,46 +113,114 @@ class VetAnimal(models.Model):
             else:
                 record.age = "0"
 
+    def init(self):
+        super().init()
+        create_dob_day_index(self._cr, self._table)
+        # The field's trigram index serves ilike; exact scanner lookups need a b-tree
+        tools.create_index(self._cr, 'vet_animal_microchip_no_btree_idx', self._table, ['microchip_no'])
+
+    @api.model
+    def _cron_refresh_age(self):
+        return refresh_age_labels(self)
+
     @api.model_create_multi
     def create(self, vals_list):
+        # Resolve owners of all partner-only vals with one search
+        partner_ids = {vals["partner_id"] for vals in vals_list if vals.get("partner_id") and not vals.get("owner_id")}
+        owner_by_partner = {}
+        if partner_ids:
+            for owner in self.env["vet.animal.owner"].search([("partner_id", "in", list(partner_ids))], order="id desc"):
+                owner_by_partner[owner.partner_id.id] = owner.id
         for vals in vals_list:
             # If partner_id provided but no owner_id, auto-assign owner
             if vals.get("partner_id") and not vals.get("owner_id"):
-                owner = self.env["vet.animal.owner"].search(
-                    [("partner_id", "=", vals["partner_id"])],
-                    limit=1
-                )
-                if not owner:
+                if vals["partner_id"] not in owner_by_partner:
                     raise ValidationError("This contact is not linked to a vet owner.")
-                vals["owner_id"] = owner.id
+                vals["owner_id"] = owner_by_partner[vals["partner_id"]]
             # Mandatory owner check
             if not vals.get('owner_id'):
                 raise ValidationError("Add an owner.")
-            # Generate microchip if not provided
-            if not vals.get('microchip_no'):
-                vals['microchip_no'] = self.env['ir.sequence'].next_by_code('vet.animal.microchip') or 'HT000000'
+        # Generate microchips for the whole batch with one sequence call
+        missing = [vals for vals in vals_list if not vals.get('microchip_no')]
+        microchips = self.env['ir.sequence'].next_block_by_code('vet.animal.microchip', len(missing))
+        for vals, microchip in zip(missing, microchips):
+            vals['microchip_no'] = microchip or 'HT000000'
+        self.env['vet.animal.owner']._clear_reception_cache()
         return super(VetAnimal, self).create(vals_list)
 
+    def write(self, vals):
+        if RECEPTION_ANIMAL_FIELDS.intersection(vals):
+            self.env['vet.animal.owner']._clear_reception_cache()
+        if 'name' not in vals:
+            return super().write(vals)
+        # Visits and invoices copy the name; bulk renames can queue that fan-out
+        with self.env['vet.recompute.queue']._defer_dependents(ANIMAL_RENAME_DEPENDENTS):
+            return super().write(vals)
+
+    def unlink(self):
+        self.env['vet.animal.owner']._clear_reception_cache()
+        return super().unlink()
+
+    @api.depends('microchip_no', 'name', 'owner_id.name', 'owner_id.contact_number')
+    def _compute_display_label(self):
+        for animal in self:
+            parts = []
+            if animal.microchip_no:
+                parts.append(f"#{animal.microchip_no}")
+            if animal.name:
+                parts.append(animal.name)
+            if animal.owner_id:
+                parts.append(f"Owner: {animal.owner_id.name}")
+                if animal.owner_id.contact_number:
+                    parts.append(f"Phone: {animal.owner_id.contact_number}")
+            animal.display_label = " | ".join(parts)
+
+    @api.depends('display_label')
+    def _compute_display_name(self):
+        for animal in self:
+            animal.display_name = animal.display_label or animal.name or ""
+
     def name_get(self):
-        result = []
-        for rec in self:
-            display = "[%s] %s" % (rec.microchip_no or "", rec.name or "")
-            if rec.owner_id:
-                display = "%s - Owner: %s" % (display, rec.owner_id.name)
-            result.append((rec.id, display))
-        return result
+        return [(animal.id, animal.display_label or animal.name or "") for animal in self]
+
+    @api.model
+    def _search_ranked(self, name, args, limit):
+        """Return animals matching name, best matches first.
+
+        Stages run from most to least selective and stop once limit is reached:
+        exact microchip, microchip/name prefix, name/microchip substring, then
+        owner name substring. The substring stages are served by the trigram
+        indexes on vet_animal.name, vet_animal.microchip_no and
+        vet_animal_owner.name.
+        """
+        prefix = f"{tools.escape_psql(name)}%"
+        stages = [
+            [('microchip_no', '=', name)],
+            ['|', ('microchip_no', '=ilike', prefix), ('name', '=ilike', prefix)],
+            ['|', ('microchip_no', 'ilike', name), ('name', 'ilike', name)],
+            [('owner_id.name', 'ilike', name)],
+        ]
+        found = self.browse()
+        for domain in stages:
+            remaining = limit - len(found) if limit else None
+            if remaining is not None and remaining <= 0:
+                break
+            if found:
+                domain = domain + [('id', 'not in', found.ids)]
+            found |= self.search(domain + args, limit=remaining)
+        return found
 
     @api.model
+    @instrumented('vet.animal.name_search', rows=lambda self, args, result: len(result))
     def name_search(self, name='', args=None, operator='ilike', limit=100):
         args = args or []
-        domain = []
         name = (name or '').strip()
+        if not name:
+            return self.search(args, limit=limit).name_get()
         if name.startswith('#'):
             chip = name[1:].strip()
-            domain = [('microchip_no', '=', chip)]
-        elif name.upper().startswith('HT'):
-            domain = [('microchip_no', operator, name)]
-        else:
-            domain = [('name', operator, name)]
-        records = self.search(domain + args, limit=limit)
-        return records.name_get()
\ No newline at end of file
+            return self.search([('microchip_no', '=', chip)] + args, limit=limit).name_get()
+        if operator != 'ilike':
+            domain = ['|', ('microchip_no', operator, name), ('name', operator, name)]
+            return self.search(domain + args, limit=limit).name_get()
+        return self._search_ranked(name, args, limit).name_get()
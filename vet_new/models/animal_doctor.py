@@ -1,4 +1,8 @@
-from odoo import models, fields
+from odoo import models, fields, api
+from datetime import timedelta
+from pytz import utc
+
+from odoo.addons.resource.models.utils import Intervals
 
 class VetAnimalDoctor(models.Model):
     _name = 'vet.animal.doctor'
@@ -13,7 +17,69 @@ class VetAnimalDoctor(models.Model):
     active = fields.Boolean(default=True)
     visit_ids = fields.One2many('vet.animal.visit', 'doctor_id', string='Visits')
     notes = fields.Text("Notes")
+    resource_calendar_id = fields.Many2one(
+        'resource.calendar',
+        string="Working Hours",
+        default=lambda self: self.env.company.resource_calendar_id,
+        help="Working hour template used to compute free appointment slots."
+    )
 
     _sql_constraints = [
         ('unique_contact_number', 'unique(contact_number)', 'Contact number must be unique!')
     ]
+
+    @api.model
+    def get_free_slots(self, start, end, slot_minutes=30, doctor_ids=None):
+        """Free appointment slots of every doctor between start and end (UTC).
+
+        Working intervals come from each doctor's working hours template; booked
+        appointments of all doctors in the period are loaded with one query and
+        subtracted. Returns {doctor_id: [(slot_start, slot_end), ...]} with
+        UTC datetime strings.
+        """
+        start = fields.Datetime.to_datetime(start)
+        end = fields.Datetime.to_datetime(end)
+        doctors = self.browse(doctor_ids) if doctor_ids else self.search([])
+        if not doctors or start >= end:
+            return {}
+
+        Schedule = self.env['vet.animal.schedule']
+        Schedule.flush_model(['doctor_id', 'start_datetime', 'end_datetime', 'status', 'active'])
+        self.env.cr.execute("""
+            SELECT doctor_id, start_datetime, end_datetime
+              FROM vet_animal_schedule
+             WHERE doctor_id IN %s
+               AND start_datetime < %s
+               AND end_datetime > %s
+               AND active
+               AND status NOT IN %s
+        """, (tuple(doctors.ids), end, start, Schedule._FREE_STATUSES))
+        booked = {}
+        for doctor_id, slot_start, slot_end in self.env.cr.fetchall():
+            booked.setdefault(doctor_id, []).append(
+                (utc.localize(slot_start), utc.localize(slot_end), Schedule)
+            )
+
+        start_utc, end_utc = utc.localize(start), utc.localize(end)
+        work_by_calendar = {
+            calendar: calendar._work_intervals_batch(start_utc, end_utc)[False]
+            for calendar in doctors.resource_calendar_id
+        }
+        step = timedelta(minutes=slot_minutes)
+        result = {}
+        for doctor in doctors:
+            if not doctor.resource_calendar_id:
+                result[doctor.id] = []
+                continue
+            free = work_by_calendar[doctor.resource_calendar_id] - Intervals(booked.get(doctor.id, []))
+            slots = []
+            for interval_start, interval_stop, _records in free:
+                slot_start = interval_start
+                while slot_start + step <= interval_stop:
+                    slots.append((
+                        fields.Datetime.to_string(slot_start.astimezone(utc).replace(tzinfo=None)),
+                        fields.Datetime.to_string((slot_start + step).astimezone(utc).replace(tzinfo=None)),
+                    ))
+                    slot_start += step
+            result[doctor.id] = slots
+        return result
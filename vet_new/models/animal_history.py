@@ -1,5 +1,8 @@
 from odoo import api, fields, models
 
+from .animal_owner import normalize_phone
+from .vet_perf import instrumented
+
 class VetAnimalHistoryWizard(models.TransientModel):
     _name = "vet.animal.history.wizard"
     _description = "Animal Visit History Search"
@@ -8,8 +11,21 @@ class VetAnimalHistoryWizard(models.TransientModel):
     animal_name = fields.Char(string="Animal Name", readonly=False)
     partner_id = fields.Many2one("res.partner", string="Owner")
     contact_number = fields.Char(string="Owner Contact")
-    history_line_ids = fields.One2many("vet.animal.history.line", "wizard_id", string="History Lines")
-    total_visits = fields.Integer(string="Total Visits", readonly=True)
+
+    # Keyset pagination state: the (date, id) of the last visit on the current
+    # page. Results themselves are computed from vet_animal_visit on read and
+    # never stored.
+    searched = fields.Boolean()
+    page_size = fields.Integer(string="Page Size", default=50)
+    cursor_date = fields.Datetime()
+    cursor_id = fields.Integer()
+    page_number = fields.Integer(default=1, readonly=True)
+
+    visit_ids = fields.Many2many("vet.animal.visit", string="Visits", compute="_compute_history")
+    has_next_page = fields.Boolean(compute="_compute_history")
+    total_visits = fields.Integer(string="Total Visits", compute="_compute_history")
+    total_spent = fields.Float(string="Total Spent", compute="_compute_history", digits=(16, 2))
+    doctor_summary = fields.Text(string="Last Visit per Doctor", compute="_compute_history")
 
     @api.onchange('partner_id')
     def _onchange_partner(self):
@@ -33,7 +49,7 @@ class VetAnimalHistoryWizard(models.TransientModel):
     @api.onchange('contact_number')
     def _onchange_contact_number(self):
         if self.contact_number:
-            owner = self.env['res.partner'].search([('phone', '=', self.contact_number)], limit=1)
+            owner = self.env['res.partner'].search([('vet_phone_key', '=', normalize_phone(self.contact_number))], limit=1)
             if owner:
                 self.partner_id = owner
                 animals = self.env['vet.animal'].search([('owner_id.partner_id', '=', owner.id)])
@@ -48,37 +64,89 @@ class VetAnimalHistoryWizard(models.TransientModel):
             self.animal_id = False
             return {'domain': {'animal_id': [('id', '=', False)]}}
 
-    def action_search_history(self):
+    def _get_history_where(self):
+        """SQL condition and params on vet_animal_visit v for the current filters."""
         self.ensure_one()
-        domain = []
-
         if self.animal_id:
-            domain.append(('animal_id', '=', self.animal_id.id))
-        elif self.animal_name:
-            animals = self.env['vet.animal'].search([('name', 'ilike', self.animal_name)])
-            domain.append(('animal_id', 'in', animals.ids)) if animals else domain.append(('id', '=', 0))
-        elif self.contact_number:
-            owner = self.env['res.partner'].search([('phone', '=', self.contact_number)], limit=1)
-            if owner:
-                animals = self.env['vet.animal'].search([('owner_id.partner_id', '=', owner.id)])
-                domain.append(('animal_id', 'in', animals.ids)) if animals else domain.append(('id', '=', 0))
-            else:
-                domain.append(('id', '=', 0))
+            return "v.animal_id = %s", [self.animal_id.id]
+        if self.animal_name:
+            return "v.animal_id IN (SELECT id FROM vet_animal WHERE name ILIKE %s)", [f"%{self.animal_name}%"]
+        if self.contact_number:
+            return (
+                "v.animal_id IN (SELECT a.id FROM vet_animal a"
+                " JOIN vet_animal_owner o ON o.id = a.owner_id"
+                " WHERE o.phone_key = %s)"
+            ), [normalize_phone(self.contact_number)]
+        return "TRUE", []
+
+    @api.depends('searched', 'animal_id', 'animal_name', 'contact_number', 'page_size', 'cursor_date', 'cursor_id')
+    @instrumented('vet.animal.history.search',
+                  rows=lambda self, args, result: sum(len(w.visit_ids) for w in self))
+    def _compute_history(self):
+        Visit = self.env['vet.animal.visit']
+        Visit.flush_model(['animal_id', 'date', 'doctor_id', 'total_amount'])
+        self.env['vet.animal'].flush_model(['name', 'owner_id'])
+        self.env['vet.animal.owner'].flush_model(['phone_key'])
+        cr = self.env.cr
+        for wizard in self:
+            if not wizard.searched:
+                wizard.visit_ids = Visit
+                wizard.has_next_page = False
+                wizard.total_visits = 0
+                wizard.total_spent = 0.0
+                wizard.doctor_summary = False
+                continue
 
-        visits = self.env['vet.animal.visit'].search(domain, order='date desc')
+            where, params = wizard._get_history_where()
+            page_size = max(wizard.page_size or 50, 1)
 
-        lines = [(0, 0, {
-            'visit_id': visit.id,
-            'visit_date': visit.date,
-            'doctor': visit.doctor_id.name,
-            'notes': visit.notes or '-',
-            'total_amount': visit.total_amount,
-        }) for visit in visits]
+            page_where, page_params = where, list(params)
+            # Visits without a date sort last; the cursor is set by its id
+            # alone, as the last visit of a page may have no date
+            if wizard.cursor_id:
+                page_where += " AND (COALESCE(v.date, '-infinity'), v.id) < (COALESCE(%s::timestamp, '-infinity'), %s)"
+                page_params += [wizard.cursor_date or None, wizard.cursor_id]
+            # Fetch one extra row to know whether a next page exists
+            cr.execute(f"""
+                SELECT v.id FROM vet_animal_visit v
+                 WHERE {page_where}
+              ORDER BY COALESCE(v.date, '-infinity') DESC, v.id DESC
+                 LIMIT %s
+            """, page_params + [page_size + 1])
+            ids = [row[0] for row in cr.fetchall()]
+            wizard.has_next_page = len(ids) > page_size
+            wizard.visit_ids = Visit.browse(ids[:page_size])
 
-        # reset before adding
-        self.history_line_ids = [(5, 0, 0)] + lines
-        self.total_visits = len(visits)
+            cr.execute(f"""
+                SELECT COUNT(*), COALESCE(SUM(v.total_amount), 0.0)
+                  FROM vet_animal_visit v
+                 WHERE {where}
+            """, params)
+            wizard.total_visits, wizard.total_spent = cr.fetchone()
 
+            cr.execute(f"""
+                SELECT d.name, MAX(v.date), COUNT(*)
+                  FROM vet_animal_visit v
+                  JOIN vet_animal_doctor d ON d.id = v.doctor_id
+                 WHERE {where}
+              GROUP BY d.id, d.name
+              ORDER BY MAX(v.date) DESC
+            """, params)
+            wizard.doctor_summary = "\n".join(
+                f"{name}: {fields.Datetime.to_string(last_date) if last_date else '-'} ({count} visits)"
+                for name, last_date, count in cr.fetchall()
+            ) or False
+
+    def action_search_history(self):
+        self.ensure_one()
+        self.write({'searched': True, 'cursor_date': False, 'cursor_id': 0, 'page_number': 1})
+        return self._return_wizard_action()
+
+    def action_next_page(self):
+        self.ensure_one()
+        if self.has_next_page and self.visit_ids:
+            last = self.visit_ids[-1]
+            self.write({'cursor_date': last.date, 'cursor_id': last.id, 'page_number': self.page_number + 1})
         return self._return_wizard_action()
 
     def _return_wizard_action(self):
@@ -90,15 +158,3 @@ class VetAnimalHistoryWizard(models.TransientModel):
             'res_id': self.id,
             'target': 'new',
         }
-class VetAnimalHistoryLine(models.TransientModel):
-    _name = "vet.animal.history.line"
-    _description = "Animal Visit History Line"
-
-    wizard_id = fields.Many2one("vet.animal.history.wizard", string="Wizard", ondelete="cascade")
-    visit_id = fields.Many2one("vet.animal.visit", string="Visit")
-    visit_date = fields.Datetime(string="Visit Date")
-    doctor = fields.Char(string="Doctor")
-    notes = fields.Text(string="Notes")
-    total_amount = fields.Monetary(string="Total Amount", currency_field="currency_id")
-
-    currency_id = fields.Many2one("res.currency", default=lambda self: self.env.company.currency_id)
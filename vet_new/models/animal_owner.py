@@ -1,8 +1,27 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import index_exists
+import logging
 import re
 from dateutil.relativedelta import relativedelta
 
+from .animal import create_dob_day_index, refresh_age_labels
+from .vet_recompute_queue import PARTNER_PHONE_DEPENDENTS
+
+_logger = logging.getLogger(__name__)
+
+# res.partner fields mirrored on vet.animal.owner
+VET_OWNER_SYNC_FIELDS = {'name', 'phone', 'email', 'street', 'active'}
+# Fields whose change can alter what resolve_reception() finds
+RECEPTION_OWNER_FIELDS = {'partner_id', 'active'}
+RECEPTION_PARTNER_FIELDS = {'phone', 'active'}
+
+
+def normalize_phone(phone):
+    """Canonical lookup key for a phone number: its digits only, or False."""
+    digits = re.sub(r'\D', '', str(phone or ''))
+    return digits or False
+
 
 class VetAnimalOwner(models.Model):
     _name = 'vet.animal.owner'
@@ -27,15 +46,19 @@ class VetAnimalOwner(models.Model):
         store=True,
         readonly=False,
         tracking=True,
-        index=True
+        index='trigram'
     )
     contact_number = fields.Char(
         related="partner_id.phone",
         store=True,
         readonly=False,
         tracking=True,
-        index=True,
-        search=lambda self, operator, value: [('partner_id.phone', operator, value)]
+        index=True
+    )
+    phone_key = fields.Char(
+        related="partner_id.vet_phone_key",
+        string="Phone Key",
+        store=True
     )
     email = fields.Char(
         related="partner_id.email",
@@ -54,6 +77,45 @@ class VetAnimalOwner(models.Model):
     # Relation to animals
     animal_ids = fields.One2many('vet.animal', 'owner_id', string="Animals")
 
+    def init(self):
+        super().init()
+        # One active owner per normalized phone. Existing duplicates must be
+        # merged first; until then the index is skipped rather than failing
+        # the module update.
+        cr = self.env.cr
+        if index_exists(cr, 'vet_animal_owner_phone_key_uniq'):
+            return
+        # A new phone_key column is only computed after init(), so fill it
+        # here (same normalization as normalize_phone) before checking it.
+        cr.execute("""
+            UPDATE vet_animal_owner o
+               SET phone_key = NULLIF(regexp_replace(p.phone, '\\D', '', 'g'), '')
+              FROM res_partner p
+             WHERE p.id = o.partner_id
+               AND o.phone_key IS NULL
+               AND p.phone IS NOT NULL
+        """)
+        cr.execute("""
+            SELECT COUNT(*) FROM (
+                SELECT phone_key
+                  FROM vet_animal_owner
+                 WHERE phone_key IS NOT NULL AND active
+              GROUP BY phone_key
+                HAVING COUNT(*) > 1
+            ) dup
+        """)
+        duplicates = cr.fetchone()[0]
+        if duplicates:
+            _logger.warning(
+                "Not creating unique index on vet_animal_owner.phone_key: "
+                "%s phone numbers are shared by several active owners", duplicates)
+            return
+        cr.execute("""
+            CREATE UNIQUE INDEX vet_animal_owner_phone_key_uniq
+                ON vet_animal_owner (phone_key)
+             WHERE phone_key IS NOT NULL AND active
+        """)
+
     @api.depends(
         'partner_id.street', 'partner_id.street2', 'partner_id.city',
         'partner_id.zip', 'partner_id.state_id', 'partner_id.country_id'
@@ -68,40 +130,115 @@ class VetAnimalOwner(models.Model):
     @api.constrains('contact_number')
     def _check_owner_contact_number(self):
         for record in self:
-            phone = record.contact_number
-            if not phone:
+            if not record.contact_number:
                 raise ValidationError("Contact number must be set.")
-            if not re.fullmatch(r'\d{11}', str(phone)):
+            if not re.fullmatch(r'\d{11}', record.phone_key or ''):
                 raise ValidationError("Phone number must be exactly 11 digits.")
+        # Bulk importers validate uniqueness for the whole batch beforehand
+        if self.env.context.get("vet_phone_uniqueness_checked"):
+            return
 
-            # Check uniqueness at partner level
-            dup = self.env['res.partner'].search([
-                ('phone', '=', phone),
-                ('id', '!=', record.partner_id.id)
-            ], limit=1)
-            if dup:
-                raise ValidationError("Contact number must be unique!")
+        # Uniqueness on the normalized phone, one query for the whole recordset
+        keys = self.mapped('phone_key')
+        if len(keys) != len(set(keys)):
+            raise ValidationError("Contact number must be unique!")
+        dup = self.search([
+            ('phone_key', 'in', keys),
+            ('id', 'not in', self.ids),
+        ], limit=1)
+        if dup:
+            raise ValidationError("Contact number must be unique!")
 
     # -------------------------
     # Create Override
     # -------------------------
     @api.model_create_multi
     def create(self, vals_list):
-        for vals in vals_list:
-            partner_id = vals.get("partner_id")
-
-            # Create partner if not provided
-            if not partner_id and not self.env.context.get("skip_partner_create"):
-                partner = self.env['res.partner'].with_context(skip_owner_create=True).create({
-                    "name": vals.get("name", "Unknown Owner"),
-                    "phone": vals.get("contact_number"),
-                    "email": vals.get("email"),
-                    "street": vals.get("address"),
-                })
+        # Create the missing partners in one batch
+        if not self.env.context.get("skip_partner_create"):
+            missing = [vals for vals in vals_list if not vals.get("partner_id")]
+            partners = self.env['res.partner'].with_context(skip_owner_create=True).create([{
+                "name": vals.get("name", "Unknown Owner"),
+                "phone": vals.get("contact_number"),
+                "email": vals.get("email"),
+                "street": vals.get("address"),
+            } for vals in missing])
+            for vals, partner in zip(missing, partners):
                 vals["partner_id"] = partner.id
 
+        self._clear_reception_cache()
         return super().create(vals_list)
 
+    def write(self, vals):
+        if RECEPTION_OWNER_FIELDS.intersection(vals):
+            self._clear_reception_cache()
+        return super().write(vals)
+
+    def unlink(self):
+        self._clear_reception_cache()
+        return super().unlink()
+
+    # -------------------------
+    # Reception Resolver
+    # -------------------------
+    @api.model
+    def resolve_reception(self, phone=None, microchip=None, owner_id=None):
+        """Resolve an owner from a phone number, a microchip or an owner id.
+
+        Returns a dict with owner_id, partner_id, animal_ids and unpaid_balance
+        (owner_id is False when nothing matches). Owner, partner and animals
+        are cached per lookup key until an owner, animal or contact phone
+        changes; the balance is always read from the partner.
+        """
+        if owner_id:
+            key = ('owner', owner_id)
+        elif normalize_phone(phone):
+            key = ('phone', normalize_phone(phone))
+        elif microchip and microchip.strip():
+            key = ('microchip', microchip.strip())
+        else:
+            key = None
+        owner, partner, animal_ids = self._resolve_reception_ids(*key) if key else (False, False, ())
+        if not owner:
+            return {'owner_id': False, 'partner_id': False, 'animal_ids': [], 'unpaid_balance': 0.0}
+        return {
+            'owner_id': owner,
+            'partner_id': partner,
+            'animal_ids': list(animal_ids),
+            'unpaid_balance': self.env['res.partner'].sudo().browse(partner).vet_unpaid_amount or 0.0,
+        }
+
+    @api.model
+    @tools.ormcache('kind', 'value')
+    def _resolve_reception_ids(self, kind, value):
+        """(owner id, partner id, animal ids) for a lookup key, from one query."""
+        condition = {
+            'owner': "o.id = %s",
+            'phone': "o.phone_key = %s",
+            'microchip': "o.id = (SELECT owner_id FROM vet_animal WHERE microchip_no = %s)",
+        }[kind]
+        self.flush_model(['partner_id', 'phone_key', 'active'])
+        self.env['vet.animal'].flush_model(['owner_id', 'microchip_no', 'active'])
+        self.env.cr.execute(f"""
+            SELECT o.id,
+                   o.partner_id,
+                   COALESCE(array_agg(a.id ORDER BY a.id) FILTER (WHERE a.id IS NOT NULL), '{{}}')
+              FROM vet_animal_owner o
+         LEFT JOIN vet_animal a ON a.owner_id = o.id AND a.active
+             WHERE o.active AND {condition}
+          GROUP BY o.id, o.partner_id
+          ORDER BY o.id
+             LIMIT 1
+        """, (value,))
+        row = self.env.cr.fetchone()
+        if not row:
+            return False, False, ()
+        return row[0], row[1], tuple(row[2])
+
+    @api.model
+    def _clear_reception_cache(self):
+        self.env.registry.clear_cache()
+
 
 class ResPartnerInherit(models.Model):
     _inherit = "res.partner"
@@ -110,6 +247,62 @@ class ResPartnerInherit(models.Model):
     animal_ids = fields.One2many("vet.animal", "partner_id", string="Animals")
     dob = fields.Date(string="Date of Birth", tracking=True)
     age = fields.Char(string="Age", compute="_compute_age", store=True)
+    vet_phone_key = fields.Char(
+        string="Phone Key",
+        compute="_compute_vet_phone_key",
+        store=True,
+        index=True
+    )
+
+    # Receivable summary, kept current by the ORM whenever one of the partner's
+    # invoices changes payment_state or amount_residual.
+    vet_unpaid_invoice_count = fields.Integer(
+        string="Unpaid Invoices",
+        compute="_compute_vet_receivable",
+        store=True
+    )
+    vet_unpaid_amount = fields.Float(
+        string="Unpaid Balance",
+        compute="_compute_vet_receivable",
+        store=True,
+        digits=(16, 2)
+    )
+
+    @api.depends('phone')
+    def _compute_vet_phone_key(self):
+        for partner in self:
+            partner.vet_phone_key = normalize_phone(partner.phone)
+
+    @api.depends('invoice_ids.move_type', 'invoice_ids.payment_state', 'invoice_ids.amount_residual')
+    def _compute_vet_receivable(self):
+        summary = {}
+        partner_ids = [pid for pid in self.ids if pid]
+        if partner_ids:
+            groups = self.env['account.move'].read_group(
+                [
+                    ('partner_id', 'in', partner_ids),
+                    ('move_type', '=', 'out_invoice'),
+                    ('payment_state', 'in', ['not_paid', 'partial']),
+                ],
+                ['amount_residual'],
+                ['partner_id'],
+            )
+            summary = {
+                group['partner_id'][0]: (group['partner_id_count'], group['amount_residual'])
+                for group in groups
+            }
+        for partner in self:
+            count, amount = summary.get(partner.id, (0, 0.0))
+            partner.vet_unpaid_invoice_count = count
+            partner.vet_unpaid_amount = amount
+
+    def init(self):
+        super().init()
+        create_dob_day_index(self._cr, self._table)
+
+    @api.model
+    def _cron_refresh_age(self):
+        return refresh_age_labels(self)
 
     @api.depends('dob')
     def _compute_age(self):
@@ -124,33 +317,114 @@ class ResPartnerInherit(models.Model):
             else:
                 record.age = "0"
 
+    def _ensure_vet_owners(self):
+        """Create the missing vet.animal.owner of the partners in self.
+
+        Partners that already have an owner (archived ones included) are found
+        with one query, and all missing owners are created in one multi-create.
+        """
+        if self.env.context.get("skip_owner_create"):
+            return self.env['vet.animal.owner']
+        partner_ids = [pid for pid in self.ids if pid]
+        if not partner_ids:
+            return self.env['vet.animal.owner']
+        self.env['vet.animal.owner'].flush_model(['partner_id'])
+        self.env.cr.execute(
+            "SELECT partner_id FROM vet_animal_owner WHERE partner_id IN %s",
+            (tuple(partner_ids),),
+        )
+        with_owner = {row[0] for row in self.env.cr.fetchall()}
+        missing = self.browse([pid for pid in partner_ids if pid not in with_owner])
+        if not missing:
+            return self.env['vet.animal.owner']
+        return self.env['vet.animal.owner'].with_context(skip_partner_create=True).create([{
+            "partner_id": partner.id,
+            "name": partner.name or "Unknown Owner",
+            "contact_number": partner.phone,
+            "email": partner.email,
+            "address": partner.street,
+        } for partner in missing])
+
     @api.model_create_multi
     def create(self, vals_list):
         partners = super().create(vals_list)
-        for partner in partners:
-            if self.env.context.get("skip_owner_create"):
-                continue
-            if not partner.owner_id:
-                self.env['vet.animal.owner'].with_context(skip_partner_create=True).create({
-                    "partner_id": partner.id,
-                    "name": partner.name or "Unknown Owner",
-                    "contact_number": partner.phone,
-                    "email": partner.email,
-                    "address": partner.street,
-                })
+        partners._ensure_vet_owners()
         return partners
 
     def write(self, vals):
-        res = super().write(vals)
-        for partner in self:
-            if self.env.context.get("skip_owner_create"):
-                continue
-            if not partner.owner_id:
-                self.env['vet.animal.owner'].with_context(skip_partner_create=True).create({
-                    "partner_id": partner.id,
-                    "name": partner.name or "Unknown Owner",
-                    "contact_number": partner.phone,
-                    "email": partner.email,
-                    "address": partner.street,
-                })
+        if RECEPTION_PARTNER_FIELDS.intersection(vals) and self.owner_id:
+            self.env['vet.animal.owner']._clear_reception_cache()
+        if 'phone' in vals:
+            # Owners and all their animals copy the phone; bulk edits can queue that
+            with self.env['vet.recompute.queue']._defer_dependents(PARTNER_PHONE_DEPENDENTS):
+                res = super().write(vals)
+        else:
+            res = super().write(vals)
+        # Owners mirror these fields; writes touching nothing else (mass
+        # mailing, accounting, ...) cannot make an owner go missing.
+        if VET_OWNER_SYNC_FIELDS.intersection(vals):
+            self._ensure_vet_owners()
         return res
+
+    def unlink(self):
+        # Owners are removed by the database cascade, not by the ORM
+        if self.owner_id:
+            self.env['vet.animal.owner']._clear_reception_cache()
+        return super().unlink()
+
+    @api.model
+    def _cron_reconcile_vet_owners(self, limit=10000):
+        """Repair partner/owner drift in bulk.
+
+        Creates owners for up to limit partners that have none but carry a
+        valid 11-digit phone (company, users, vendors without one are left
+        alone), and recomputes the mirrored fields of owners whose stored
+        values no longer match their partner (e.g. after SQL-level fixes or
+        imports). A partner whose owner cannot be created is logged and
+        skipped; the resync runs regardless.
+        """
+        Owner = self.env['vet.animal.owner']
+        self.flush_model(['name', 'phone', 'email', 'vet_phone_key'])
+        Owner.flush_model(['partner_id', 'name', 'contact_number', 'email', 'phone_key'])
+        cr = self.env.cr
+        cr.execute("""
+            SELECT p.id FROM res_partner p
+             WHERE p.active
+               AND p.vet_phone_key ~ '^[0-9]{11}$'
+               AND NOT EXISTS (SELECT 1 FROM vet_animal_owner o WHERE o.partner_id = p.id)
+          ORDER BY p.id
+             LIMIT %s
+        """, (limit,))
+        candidates = self.browse([row[0] for row in cr.fetchall()])
+        created = Owner
+        try:
+            with cr.savepoint():
+                created = candidates._ensure_vet_owners()
+        except Exception:
+            # Some partner in the batch is invalid: retry one by one
+            self.env.invalidate_all()
+            for partner in candidates:
+                try:
+                    with cr.savepoint():
+                        created |= partner._ensure_vet_owners()
+                except Exception as e:
+                    self.env.invalidate_all()
+                    _logger.warning("Owner reconciliation: could not create owner for partner %s: %s", partner.id, e)
+
+        cr.execute("""
+            SELECT o.id FROM vet_animal_owner o
+              JOIN res_partner p ON p.id = o.partner_id
+             WHERE o.name IS DISTINCT FROM p.name
+                OR o.contact_number IS DISTINCT FROM p.phone
+                OR o.email IS DISTINCT FROM p.email
+                OR o.phone_key IS DISTINCT FROM p.vet_phone_key
+             LIMIT %s
+        """, (limit,))
+        drifted = Owner.browse([row[0] for row in cr.fetchall()])
+        for fname in ('name', 'contact_number', 'email', 'phone_key'):
+            self.env.add_to_compute(Owner._fields[fname], drifted)
+        drifted.flush_recordset()
+        if drifted:
+            Owner._clear_reception_cache()
+        _logger.info("Owner reconciliation: %s owners created, %s owners resynced", len(created), len(drifted))
+        return len(created), len(drifted)
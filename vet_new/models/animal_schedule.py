@@ -1,4 +1,9 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+import logging
+from datetime import timedelta
+
+_logger = logging.getLogger(__name__)
 
 class VetAnimalSchedule(models.Model):
     _name = 'vet.animal.schedule'
@@ -10,7 +15,23 @@ class VetAnimalSchedule(models.Model):
     animal_id = fields.Many2one('vet.animal', string='Animal', required=True, tracking=True)
     owner_id = fields.Many2one('vet.animal.owner', string="Owner", related='animal_id.owner_id', store=True, readonly=True)
     doctor_id = fields.Many2one('vet.animal.doctor', string='Doctor', required=True, tracking=True)
-    appointment_date = fields.Date(string='Appointment Date', required=True, tracking=True)
+    appointment_date = fields.Date(
+        string='Appointment Date',
+        compute='_compute_appointment_date',
+        store=True,
+        readonly=False,
+        required=True,
+        tracking=True
+    )
+    start_datetime = fields.Datetime(string='Start', tracking=True)
+    end_datetime = fields.Datetime(
+        string='End',
+        compute='_compute_end_datetime',
+        store=True,
+        readonly=False,
+        tracking=True
+    )
+    duration = fields.Float(string='Duration (hours)', default=0.5)
     reason = fields.Text(string="Reason for Appointment", tracking=True)
     notes = fields.Text(string="Additional Notes", tracking=True)  # Merged duplicate field
     status = fields.Selection([
@@ -22,15 +43,86 @@ class VetAnimalSchedule(models.Model):
     active = fields.Boolean(string='Active', default=True)  # For archiving
 
     _sql_constraints = [
-        ('unique_appointment', 'unique(animal_id, doctor_id, appointment_date)', 'This appointment already exists!')
+        ('unique_appointment', 'unique(animal_id, doctor_id, appointment_date)', 'This appointment already exists!'),
+        ('check_slot_order', 'CHECK(end_datetime IS NULL OR end_datetime > start_datetime)',
+         'An appointment must end after it starts.'),
+        # Needs the btree_gist extension (see init); without it the constraint
+        # is skipped with a warning and _check_doctor_overlap still applies.
+        ('doctor_no_overlap',
+         "EXCLUDE USING gist (doctor_id WITH =, tsrange(start_datetime, end_datetime) WITH &&) "
+         "WHERE (start_datetime IS NOT NULL AND active AND status != 'cancelled')",
+         'This doctor already has an appointment at that time.'),
     ]
 
+    # Appointments in these statuses do not block the doctor's time
+    _FREE_STATUSES = ('cancelled',)
+
+    def init(self):
+        super().init()
+        cr = self._cr
+        cr.execute("""
+            CREATE INDEX IF NOT EXISTS vet_animal_schedule_doctor_slot_idx
+                ON vet_animal_schedule (doctor_id, start_datetime, end_datetime)
+             WHERE start_datetime IS NOT NULL AND active AND status != 'cancelled'
+        """)
+        # The doctor_no_overlap constraint is added after init() and needs
+        # btree_gist for the equality on doctor_id.
+        try:
+            with self.env.cr.savepoint():
+                cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        except Exception as e:
+            _logger.warning("Could not create the btree_gist extension: %s", e)
+
+    @api.depends('start_datetime')
+    def _compute_appointment_date(self):
+        for appointment in self:
+            if appointment.start_datetime:
+                appointment.appointment_date = fields.Date.context_today(appointment, appointment.start_datetime)
+            elif not appointment.appointment_date:
+                appointment.appointment_date = fields.Date.today()
+
+    @api.depends('start_datetime', 'duration')
+    def _compute_end_datetime(self):
+        for appointment in self:
+            if appointment.start_datetime:
+                appointment.end_datetime = appointment.start_datetime + timedelta(hours=appointment.duration or 0.5)
+            else:
+                appointment.end_datetime = False
+
+    @api.constrains('doctor_id', 'start_datetime', 'end_datetime', 'status', 'active')
+    def _check_doctor_overlap(self):
+        """Reject overlapping slots for the same doctor, one indexed query per batch."""
+        slots = self.filtered(
+            lambda a: a.start_datetime and a.end_datetime and a.active and a.status not in self._FREE_STATUSES
+        )
+        if not slots:
+            return
+        self.flush_model(['doctor_id', 'start_datetime', 'end_datetime', 'status', 'active'])
+        self.env.cr.execute("""
+            SELECT a.name, b.name
+              FROM vet_animal_schedule a
+              JOIN vet_animal_schedule b
+                ON b.doctor_id = a.doctor_id
+               AND b.id != a.id
+               AND b.start_datetime < a.end_datetime
+               AND b.end_datetime > a.start_datetime
+               AND b.active
+               AND b.status NOT IN %s
+             WHERE a.id IN %s
+             LIMIT 1
+        """, (self._FREE_STATUSES, tuple(slots.ids)))
+        row = self.env.cr.fetchone()
+        if row:
+            raise ValidationError(_("Appointment %s overlaps with %s for the same doctor.") % row)
+
     @api.model_create_multi
     def create(self, vals_list):
         """Batch-safe creation with sequence for name and fallback for appointment_date."""
+        missing = [vals for vals in vals_list if not vals.get('name')]
+        names = self.env['ir.sequence'].next_block_by_code('vet.animal.schedule', len(missing))
+        for vals, name in zip(missing, names):
+            vals['name'] = name or 'SCH00000'
         for vals in vals_list:
-            if not vals.get('name'):
-                vals['name'] = self.env['ir.sequence'].next_by_code('vet.animal.schedule') or 'SCH00000'
             if not vals.get('appointment_date'):
                 vals['appointment_date'] = fields.Date.today()
         return super(VetAnimalSchedule, self).create(vals_list)
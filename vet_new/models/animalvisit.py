@@ -1,9 +1,17 @@
-from odoo import api, fields, models, _
-from odoo.exceptions import UserError, ValidationError
+from odoo import api, fields, models, tools, _
+from odoo.exceptions import AccessError, UserError, ValidationError
 import logging
+from datetime import timedelta
+
+from .vet_perf import instrumented
 
 _logger = logging.getLogger(__name__)
 
+# Number of invoices posted per action_post() call in batch invoicing
+INVOICE_POST_CHUNK = 500
+# Number of visits per UPDATE statement in the SQL totals recompute
+RECOMPUTE_CHUNK = 10000
+
 class VetAnimalVisit(models.Model):
     _name = "vet.animal.visit"
     _inherit = ['mail.thread', 'mail.activity.mixin']
@@ -21,8 +29,9 @@ class VetAnimalVisit(models.Model):
     animal_ids = fields.Many2many('vet.animal', compute='_compute_animals_for_owner', string="Owner's Animals")
     animal_name = fields.Many2one('vet.animal', string="Animal Name")
     animal_display_name = fields.Char(string="Animal Name", compute="_compute_animal_display_name", store=True)
-    animal_pic = fields.Image(string="Animal Picture", related='animal_id.image_1920', store=True, readonly=False)
-    debug_animal_pic = fields.Char(compute="_compute_debug_animal_pic")
+    # Served from the animal's resized variants; visits keep no copy of the image
+    animal_pic = fields.Image(string="Animal Picture", related='animal_id.image_512')
+    animal_pic_128 = fields.Image(string="Animal Thumbnail", related='animal_id.image_128')
     owner_id = fields.Many2one('vet.animal.owner', string="Owner")
     contact_number = fields.Char(string="Owner Contact")
     doctor_id = fields.Many2one("vet.animal.doctor", string="Doctor")
@@ -69,7 +78,11 @@ class VetAnimalVisit(models.Model):
         string="Payment Status", compute="_compute_payment_state", store=True
     )
     has_unpaid_invoice = fields.Boolean(string="Has Unpaid Invoice", compute="_compute_has_unpaid_invoice", store=True)
-    state = fields.Selection([('draft', 'Draft'), ('confirmed', 'Confirmed'), ('done', 'Done'), ('cancel', 'Cancelled')], default='draft')
+    # Driven by the invoices' payment state, see _compute_state
+    state = fields.Selection(
+        [('draft', 'Draft'), ('confirmed', 'Confirmed'), ('done', 'Done'), ('cancel', 'Cancelled')],
+        compute='_compute_state', store=True, readonly=False
+    )
     delivered = fields.Boolean(default=False, string="Vaccines Delivered")
     amount_received = fields.Float(compute='_compute_amount_received')
     latest_payment_amount = fields.Float(
@@ -85,6 +98,15 @@ class VetAnimalVisit(models.Model):
         digits=(16, 2),
     )
 
+    def init(self):
+        # Keyset pagination of visit history per animal (newest first, visits
+        # without a date last), matching the order of the history wizard
+        tools.drop_index(self._cr, 'vet_animal_visit_animal_date_id_idx', self._table)
+        tools.create_index(
+            self._cr, 'vet_animal_visit_animal_history_idx', self._table,
+            ['animal_id', "COALESCE(date, '-infinity') DESC", 'id DESC'],
+        )
+
     # ------------------------
     # COMPUTES
     # ------------------------
@@ -93,73 +115,56 @@ class VetAnimalVisit(models.Model):
         for visit in self:
             # Use the latest payment amount if available
             visit.amount_received = visit.latest_payment_amount or 0.0
-    @api.depends('owner_id.partner_id')
+    @api.depends('owner_id.partner_id.vet_unpaid_invoice_count')
     def _compute_has_unpaid_invoice(self):
-        AccountMove = self.env['account.move']
         for visit in self:
-            has_unpaid = False
-            partner = visit.owner_id.partner_id
-            if partner:
-                unpaid = AccountMove.search_count([
-                    ('partner_id', '=', partner.id),
-                    ('move_type', '=', 'out_invoice'),
-                    ('payment_state', 'in', ['not_paid', 'partial']),
-                ])
-                has_unpaid = unpaid > 0
-            visit.has_unpaid_invoice = has_unpaid
+            visit.has_unpaid_invoice = visit.owner_id.partner_id.vet_unpaid_invoice_count > 0
 
     @api.depends('payment_state')
     def _compute_is_fully_paid(self):
         for visit in self:
-            old_state = visit.state
             visit.is_fully_paid = visit.payment_state == 'paid'
-            if visit.state not in ['cancel']:
-                new_state = 'done' if visit.payment_state == 'paid' else 'confirmed'
-                if visit.state != new_state:
-                    visit.state = new_state
-                    _logger.info("Visit %s: State changed from %s to %s (payment_state=%s, is_fully_paid=%s)",
-                                 visit.name, old_state, new_state, visit.payment_state, visit.is_fully_paid)
-                else:
-                    _logger.info(
-                        "Visit %s: No state change needed, payment_state=%s, is_fully_paid=%s, current_state=%s",
-                        visit.name, visit.payment_state, visit.is_fully_paid, visit.state)
-
-    @api.depends('animal_id', 'animal_id.image_1920')
-    def _compute_debug_animal_pic(self):
-        for rec in self:
-            if rec.animal_id:
-                _logger.info(
-                    "VetAnimalVisit[%s]: animal_id=%s, image_1920 exists=%s, animal_pic exists=%s",
-                    rec.id,
-                    rec.animal_id.name,
-                    bool(rec.animal_id.image_1920),
-                    bool(rec.animal_pic)
-                )
-                rec.debug_animal_pic = str(bool(rec.animal_pic))
-            else:
-                _logger.warning("VetAnimalVisit[%s]: No animal_id set", rec.id)
-                rec.debug_animal_pic = "No animal_id"
 
-    @api.depends('animal_id.image_1920')
-    def _compute_animal_pic(self):
-        for rec in self:
-            rec.animal_pic = rec.animal_id.image_1920 or False
+    @api.model
+    def _next_state(self, state, payment_state, invoiced):
+        """Visit state after a payment change; the single place the transitions live.
+
+        Cancelled visits never move. A paid visit is done; an invoiced or
+        previously done visit that is not fully paid is confirmed. Anything
+        else keeps its state (a draft stays draft until confirmed by hand).
+        """
+        if state == 'cancel':
+            return state
+        if payment_state == 'paid' and invoiced:
+            return 'done'
+        if invoiced or state == 'done':
+            return 'confirmed'
+        return state or 'draft'
+
+    @api.depends('payment_state', 'invoice_ids')
+    def _compute_state(self):
+        # Recomputed by the ORM when account.move payment states change, and
+        # flushed as one batched UPDATE; reading visits never writes.
+        for visit in self:
+            visit.state = self._next_state(visit.state, visit.payment_state, bool(visit.invoice_ids))
 
-    @api.depends("animal_id")
+    @api.depends("animal_id.name")
     def _compute_animal_display_name(self):
         for record in self:
             record.animal_display_name = record.animal_id.name if record.animal_id else ""
 
+    def _resolve_reception(self, **keys):
+        """Owner and animals for the reception form, via vet.animal.owner.resolve_reception()."""
+        res = self.env['vet.animal.owner'].resolve_reception(**keys)
+        return self.env['vet.animal.owner'].browse(res['owner_id']), self.env['vet.animal'].browse(res['animal_ids'])
+
     @api.depends('owner_id', 'contact_number')
     def _compute_animals_for_owner(self):
         for record in self:
             if record.owner_id:
-                animals = self.env['vet.animal'].search([('owner_id', '=', record.owner_id.id)])
-            elif record.contact_number:
-                partners = self.env['res.partner'].search([('phone', '=', record.contact_number)])
-                animals = self.env['vet.animal'].search([('owner_id', 'in', partners.ids)]) if partners else self.env['vet.animal'].browse()
+                _owner, animals = record._resolve_reception(owner_id=record.owner_id.id)
             else:
-                animals = self.env['vet.animal'].browse()
+                _owner, animals = record._resolve_reception(phone=record.contact_number)
             record.animal_ids = animals
 
     @api.depends('service_line_ids.subtotal', 'test_line_ids.subtotal', 'medicine_line_ids.subtotal', 'treatment_charge', 'discount_percent', 'discount_fixed')
@@ -194,10 +199,91 @@ class VetAnimalVisit(models.Model):
             else:
                 visit.payment_state = 'not_paid'
 
-    @api.depends("owner_id")
+    @api.depends("owner_id.partner_id.vet_unpaid_amount")
     def _compute_owner_unpaid_balance(self):
         for visit in self:
-            visit.owner_unpaid_balance = visit._get_owner_unpaid_balance()
+            visit.owner_unpaid_balance = visit.owner_id.partner_id.vet_unpaid_amount or 0.0
+
+    # ------------------------
+    # Bulk maintenance
+    # ------------------------
+    @api.model
+    def _recompute_totals_sql(self, visit_ids=None, chunk_size=RECOMPUTE_CHUNK):
+        """Recompute line subtotals and visit subtotal/total_amount with grouped SQL.
+
+        Mirrors _compute_subtotal and _compute_totals: subtotal is the sum of
+        service, test and vaccine lines; the percent discount applies first,
+        otherwise the fixed one. Runs on visit_ids (all visits when None) in
+        chunks of chunk_size and returns the number of visits updated.
+        """
+        self.env.flush_all()
+        cr = self.env.cr
+        if visit_ids is None:
+            cr.execute("SELECT id FROM vet_animal_visit ORDER BY id")
+            visit_ids = [row[0] for row in cr.fetchall()]
+
+        updated = 0
+        for chunk in tools.split_every(chunk_size, visit_ids):
+            chunk = tuple(chunk)
+            cr.execute("""
+                UPDATE vet_animal_visit_line
+                   SET subtotal = COALESCE(quantity, 0) * COALESCE(price_unit, 0)
+                 WHERE visit_id IN %s
+            """, (chunk,))
+            cr.execute("""
+                UPDATE vet_animal_visit v
+                   SET subtotal = t.subtotal,
+                       total_amount = CASE
+                           WHEN COALESCE(v.discount_percent, 0) > 0
+                               THEN (t.subtotal + COALESCE(v.treatment_charge, 0)) * (1 - v.discount_percent / 100.0)
+                           WHEN COALESCE(v.discount_fixed, 0) > 0
+                               THEN t.subtotal + COALESCE(v.treatment_charge, 0) - v.discount_fixed
+                           ELSE t.subtotal + COALESCE(v.treatment_charge, 0)
+                       END
+                  FROM (
+                        SELECT v2.id, COALESCE(SUM(l.subtotal), 0) AS subtotal
+                          FROM vet_animal_visit v2
+                     LEFT JOIN vet_animal_visit_line l
+                            ON l.visit_id = v2.id
+                           AND l.service_type IN ('service', 'test', 'vaccine')
+                         WHERE v2.id IN %s
+                      GROUP BY v2.id
+                  ) t
+                 WHERE v.id = t.id
+            """, (chunk,))
+            updated += cr.rowcount
+            _logger.info("Recomputed totals for %s visits (%s so far)", len(chunk), updated)
+
+        self.env['vet.animal.visit.line'].invalidate_model(['subtotal'])
+        self.invalidate_model(['subtotal', 'total_amount'])
+        return updated
+
+    def action_recompute_totals(self):
+        self._check_recompute_totals_access()
+        return self._notify_totals_recomputed(self._recompute_totals_sql(self.ids))
+
+    @api.model
+    def action_recompute_all_totals(self):
+        self._check_recompute_totals_access()
+        return self._notify_totals_recomputed(self._recompute_totals_sql())
+
+    @api.model
+    def _check_recompute_totals_access(self):
+        # The SQL recompute bypasses record rules and write access checks
+        if not self.env.is_system():
+            raise AccessError(_("Only administrators can recompute visit totals."))
+
+    @api.model
+    def _notify_totals_recomputed(self, count):
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Totals Recomputed"),
+                'message': _("Subtotals and totals recomputed for %s visit(s).") % count,
+                'sticky': False,
+            }
+        }
 
     def action_confirm(self):
         for visit in self:
@@ -209,22 +295,13 @@ class VetAnimalVisit(models.Model):
     # ------------------------
     # Create / Write
     # ------------------------
-    def _update_state_from_payment(self):
-        for visit in self:
-            if visit.state == 'cancel':
-                continue
-            if visit.payment_state == 'paid':
-                visit.state = 'done'
-            elif visit.invoice_ids:
-                visit.state = 'confirmed'
-            else:
-                visit.state = 'draft'
-
-    @api.model
-    def create(self, vals):
-        if vals.get("name", _("New")) == _("New"):
-            vals["name"] = self.env["ir.sequence"].next_by_code("vet.animal.visit") or "VIS00000"
-        return super().create(vals)
+    @api.model_create_multi
+    def create(self, vals_list):
+        missing = [vals for vals in vals_list if vals.get("name", _("New")) == _("New")]
+        names = self.env["ir.sequence"].next_block_by_code("vet.animal.visit", len(missing))
+        for vals, name in zip(missing, names):
+            vals["name"] = name or "VIS00000"
+        return super().create(vals_list)
 
     def write(self, vals):
         # Skip validation for payment operations and state changes
@@ -261,7 +338,7 @@ class VetAnimalVisit(models.Model):
         domain = {'animal_id': []}
         if self.owner_id:
             self.contact_number = self.owner_id.contact_number or ''
-            animals = self.env['vet.animal'].search([('owner_id', '=', self.owner_id.id)])
+            _owner, animals = self._resolve_reception(owner_id=self.owner_id.id)
             if len(animals) == 1:
                 self.animal_id = animals[0]
             domain = {'animal_id': [('owner_id', '=', self.owner_id.id)]}
@@ -276,10 +353,9 @@ class VetAnimalVisit(models.Model):
         self.owner_id = False
         self.animal_id = False
         if self.contact_number:
-            owner = self.env['vet.animal.owner'].search([('contact_number', '=', self.contact_number.strip())], limit=1)
+            owner, animals = self._resolve_reception(phone=self.contact_number)
             if owner:
                 self.owner_id = owner
-                animals = self.env['vet.animal'].search([('owner_id', '=', owner.id)])
                 if len(animals) == 1:
                     self.animal_id = animals[0]
                 domain = {'animal_id': [('owner_id', '=', owner.id)]}
@@ -300,7 +376,7 @@ class VetAnimalVisit(models.Model):
             return
         self.owner_id = self.animal_id.owner_id
         self.contact_number = self.owner_id.contact_number or ''
-        self.animal_ids = self.env['vet.animal'].search([('owner_id', '=', self.owner_id.id)])
+        self.animal_ids = self._resolve_reception(owner_id=self.owner_id.id)[1]
         self.selected_animal_id = self.animal_id
         self.animal_name = self.animal_id
 
@@ -326,45 +402,6 @@ class VetAnimalVisit(models.Model):
         self.ensure_one()
         return self.env.ref("vet_new.report_visit_receipt").report_action(self)
 
-    def _sync_state_with_payment(self):
-        for visit in self:
-            if visit.state == "cancel":
-                continue
-            if visit.payment_state == "paid":
-                visit.state = "done"
-            elif visit.payment_state in ["partial", "not_paid"] and visit.invoice_ids:
-                visit.state = "confirmed"
-            else:
-                visit.state = "draft"
-
-    @api.constrains('payment_state', 'state')
-    def _constrain_payment_state(self):
-        for visit in self:
-            if visit.state not in ['draft', 'cancel']:
-                expected_state = 'done' if visit.payment_state == 'paid' else 'confirmed'
-                if visit.state != expected_state:
-                    visit.state = expected_state
-                    _logger.info("Visit %s: Constrained state to %s due to payment_state=%s",
-                                 visit.name, expected_state, visit.payment_state)
-
-    def _get_owner_unpaid_balance(self, exclude_visits=None):
-        self.ensure_one()
-        if not self.owner_id or not self.owner_id.partner_id:
-            return 0.0
-
-        domain = [
-            ("partner_id", "=", self.owner_id.partner_id.id),
-            ("move_type", "=", "out_invoice"),
-            ("payment_state", "in", ["not_paid", "partial"]),
-        ]
-        if exclude_visits:
-            domain.append(("visit_id", "not in", exclude_visits))
-
-        result = self.env["account.move"].read_group(
-            domain, ["amount_residual"], []
-        )
-        return result[0]["amount_residual"] if result else 0.0
-
     def _get_or_create_partner_from_owner(self, owner):
         if owner.partner_id:
             return owner.partner_id
@@ -382,144 +419,166 @@ class VetAnimalVisit(models.Model):
             if visit.discount_percent > 0 and visit.discount_fixed > 0:
                 raise ValidationError(_("You cannot use both Discount (%) and Discount (Fixed) at the same time. Please use only one."))
 
+    def _get_default_income_account(self):
+        Account = self.env['account.account']
+        if 'account_type' in Account._fields:
+            return Account.search([('account_type', '=', 'income')], limit=1)
+        return Account.search([('user_type_id.type', '=', 'income')], limit=1)
+
+    def _get_invoice_product_info(self, product, cache):
+        """Return (income account id, tax ids) for a product, resolved once per product."""
+        if not product:
+            return False, []
+        if product.id not in cache:
+            tmpl = product.product_tmpl_id
+            account_id = (
+                product.property_account_income_id.id
+                or tmpl.property_account_income_id.id
+                or tmpl.categ_id.property_account_income_categ_id.id
+            )
+            cache[product.id] = (account_id, product.taxes_id.ids)
+        return cache[product.id]
+
+    def _prepare_invoice_vals(self, default_account_id, product_cache):
+        self.ensure_one()
+        invoice_lines = []
+        first_account_id = default_account_id
+
+        for line, fallback_name in (
+            [(l, _("Service")) for l in self.service_line_ids]
+            + [(l, _("Test")) for l in self.test_line_ids]
+            + [(l, _("Medicine")) for l in self.medicine_line_ids]
+        ):
+            prod, qty, price = line.product_id, line.quantity or 1.0, line.price_unit or 0.0
+            product_account_id, tax_ids = self._get_invoice_product_info(prod, product_cache)
+            account_id = product_account_id or first_account_id
+            if not account_id:
+                raise UserError(
+                    _("Please configure an Income Account for product %s.") % (prod.display_name if prod else ""))
+            if not first_account_id:
+                first_account_id = account_id
+            invoice_lines.append((0, 0, {
+                'product_id': prod.id if prod else False,
+                'name': prod.display_name if prod else (line.service_id.name if line.service_id else fallback_name),
+                'quantity': qty,
+                'price_unit': price,
+                'account_id': account_id,
+                'tax_ids': [(6, 0, tax_ids)],
+            }))
+
+        if self.treatment_charge and float(self.treatment_charge) != 0.0:
+            if not first_account_id:
+                raise UserError(_("Cannot determine an income account for Treatment Charge."))
+            invoice_lines.append((0, 0, {
+                'product_id': False,
+                'name': _("Treatment Charge"),
+                'quantity': 1.0,
+                'price_unit': float(self.treatment_charge),
+                'account_id': first_account_id,
+                'tax_ids': [(6, 0, [])],
+            }))
+
+        if self.discount_percent > 0:
+            for line in invoice_lines:
+                line[2]['discount'] = self.discount_percent
+        elif self.discount_fixed > 0:
+            if not first_account_id:
+                raise UserError(_("Please configure an Income Account for discounts."))
+            invoice_lines.append((0, 0, {
+                'product_id': False,
+                'name': _("Discount"),
+                'quantity': 1.0,
+                'price_unit': -float(self.discount_fixed),
+                'account_id': first_account_id,
+                'tax_ids': [(6, 0, [])],
+            }))
+
+        if not invoice_lines:
+            raise UserError(_("No invoiceable lines found for this visit. To pay previous balances, use the Complete Payment action."))
+
+        return {
+            'partner_id': self.owner_id.partner_id.id,
+            'move_type': 'out_invoice',
+            'invoice_line_ids': invoice_lines,
+            'invoice_date': fields.Date.context_today(self),
+            'invoice_origin': self.name,
+            'visit_id': self.id,
+        }
+
+    def _create_invoices(self, raise_on_error=True):
+        """Create and post invoices for all visits in self with a single multi-create.
+
+        Income accounts and taxes are resolved once per product; moves are posted
+        in chunks of INVOICE_POST_CHUNK. When raise_on_error is False, visits that
+        cannot be invoiced are skipped and logged instead of aborting the batch.
+        """
+        if not self:
+            return self.env['account.move']
+
+        default_account_id = self._get_default_income_account().id
+        product_cache = {}
+        vals_list = []
+        invoiced_visits = self.browse()
+        for visit in self:
+            try:
+                vals_list.append(visit._prepare_invoice_vals(default_account_id, product_cache))
+            except UserError as e:
+                if raise_on_error:
+                    raise
+                _logger.warning("Skipping invoice for visit %s: %s", visit.name, e)
+                continue
+            invoiced_visits |= visit
+
+        invoices = self.env['account.move'].create(vals_list)
+
+        missing_account_lines = invoices.invoice_line_ids.filtered(lambda l: not l.account_id)
+        for invoice in missing_account_lines.move_id:
+            fallback = invoice.invoice_line_ids[:1].account_id.id
+            if not fallback:
+                raise UserError(_("Invoice created but some lines have no account. Configure income accounts."))
+            missing_account_lines.filtered(lambda l: l.move_id == invoice).write({'account_id': fallback})
+
+        for start in range(0, len(invoices), INVOICE_POST_CHUNK):
+            invoices[start:start + INVOICE_POST_CHUNK].action_post()
+
+        _logger.info("Created and posted %s invoices for %s visits", len(invoices), len(invoiced_visits))
+        return invoices
+
+    @instrumented('vet.animal.visit.create_invoice')
     def action_create_invoice(self):
         for visit in self:
             if visit.invoice_ids:
                 raise UserError(_("An invoice already exists for this visit."))
-
             if not visit.owner_id or not visit.owner_id.partner_id:
                 raise UserError(_("Please set an owner with a linked partner before creating an invoice."))
+        self._create_invoices()
+        return True
 
-            partner = visit.owner_id.partner_id
-            invoice_lines = []
-            first_account_id = False
-
-            Account = self.env['account.account']
-            if 'account_type' in Account._fields:
-                income_account = Account.search([('account_type', '=', 'income')], limit=1)
-            else:
-                income_account = Account.search([('user_type_id.type', '=', 'income')], limit=1)
-            if income_account:
-                first_account_id = income_account.id
-
-            def _get_income_account_for_product(product):
-                if not product:
-                    return None
-                tmpl = product.product_tmpl_id
-                return (
-                    product.property_account_income_id.id
-                    or (tmpl.property_account_income_id.id if tmpl and tmpl.property_account_income_id else False)
-                    or (
-                        tmpl.categ_id.property_account_income_categ_id.id if tmpl and tmpl.categ_id and tmpl.categ_id.property_account_income_categ_id else False)
-                )
-
-            for service in visit.service_line_ids:
-                prod, qty, price = service.product_id, service.quantity or 1.0, service.price_unit or 0.0
-                account_id = _get_income_account_for_product(prod) or first_account_id
-                if not account_id:
-                    raise UserError(
-                        _("Please configure an Income Account for product %s.") % (prod.display_name if prod else ""))
-                if not first_account_id:
-                    first_account_id = account_id
-                invoice_lines.append((0, 0, {
-                    'product_id': prod.id if prod else False,
-                    'name': prod.display_name if prod else (
-                        service.service_id.name if service.service_id else _("Service")),
-                    'quantity': qty,
-                    'price_unit': price,
-                    'account_id': account_id,
-                    'tax_ids': [(6, 0, prod.taxes_id.ids if prod else [])],
-                }))
-
-            for test in visit.test_line_ids:
-                prod, qty, price = test.product_id, test.quantity or 1.0, test.price_unit or 0.0
-                account_id = _get_income_account_for_product(prod) or first_account_id
-                if not account_id:
-                    raise UserError(
-                        _("Please configure an Income Account for product %s.") % (prod.display_name if prod else ""))
-                if not first_account_id:
-                    first_account_id = account_id
-                invoice_lines.append((0, 0, {
-                    'product_id': prod.id if prod else False,
-                    'name': prod.display_name if prod else (test.service_id.name if test.service_id else _("Test")),
-                    'quantity': qty,
-                    'price_unit': price,
-                    'account_id': account_id,
-                    'tax_ids': [(6, 0, prod.taxes_id.ids if prod else [])],
-                }))
-
-            for med in visit.medicine_line_ids:
-                prod, qty, price = med.product_id, med.quantity or 1.0, med.price_unit or 0.0
-                account_id = _get_income_account_for_product(prod) or first_account_id
-                if not account_id:
-                    raise UserError(
-                        _("Please configure an Income Account for product %s.") % (prod.display_name if prod else ""))
-                if not first_account_id:
-                    first_account_id = account_id
-                invoice_lines.append((0, 0, {
-                    'product_id': prod.id if prod else False,
-                    'name': prod.display_name if prod else (med.service_id.name if med.service_id else _("Medicine")),
-                    'quantity': qty,
-                    'price_unit': price,
-                    'account_id': account_id,
-                    'tax_ids': [(6, 0, prod.taxes_id.ids if prod else [])],
-                }))
-
-            if visit.treatment_charge and float(visit.treatment_charge) != 0.0:
-                if not first_account_id:
-                    raise UserError(_("Cannot determine an income account for Treatment Charge."))
-                invoice_lines.append((0, 0, {
-                    'product_id': False,
-                    'name': _("Treatment Charge"),
-                    'quantity': 1.0,
-                    'price_unit': float(visit.treatment_charge),
-                    'account_id': first_account_id,
-                    'tax_ids': [(6, 0, [])],
-                }))
-
-            if visit.discount_percent > 0:
-                for line in invoice_lines:
-                    line[2]['discount'] = visit.discount_percent
-            elif visit.discount_fixed > 0:
-                if not first_account_id:
-                    raise UserError(_("Please configure an Income Account for discounts."))
-                invoice_lines.append((0, 0, {
-                    'product_id': False,
-                    'name': _("Discount"),
-                    'quantity': 1.0,
-                    'price_unit': -float(visit.discount_fixed),
-                    'account_id': first_account_id,
-                    'tax_ids': [(6, 0, [])],
-                }))
-
-            if not invoice_lines:
-                raise UserError(_("No invoiceable lines found for this visit. To pay previous balances, use the Complete Payment action."))
-
-            invoice_vals = {
-                'partner_id': partner.id,
-                'move_type': 'out_invoice',
-                'invoice_line_ids': invoice_lines,
-                'invoice_date': fields.Date.context_today(self),
-                'invoice_origin': visit.name,
-                'visit_id': visit.id,
+    def action_create_invoice_batch(self):
+        """Server action: invoice every selected visit that can be invoiced, skipping the rest."""
+        visits = self.filtered(
+            lambda v: v.state == 'confirmed' and not v.invoice_ids and v.owner_id.partner_id
+        )
+        invoices = visits._create_invoices(raise_on_error=False)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Batch Invoicing"),
+                'message': _("%s invoice(s) created for %s selected visit(s).") % (len(invoices), len(self)),
+                'sticky': False,
             }
-            invoice = self.env['account.move'].create(invoice_vals)
-
-            missing_account_lines = invoice.invoice_line_ids.filtered(lambda l: not l.account_id)
-            if missing_account_lines:
-                fallback = invoice.invoice_line_ids[:1].account_id.id if invoice.invoice_line_ids[
-                    :1].account_id else False
-                if fallback:
-                    missing_account_lines.write({'account_id': fallback})
-                else:
-                    raise UserError(_("Invoice created but some lines have no account. Configure income accounts."))
-
-            invoice.action_post()
-            visit.invoice_ids = [(4, invoice.id)]
-            _logger.info("Invoice %s created and posted for visit %s", invoice.name, visit.name)
-            visit._sync_state_with_payment()
+        }
 
-            return True
+    @api.model
+    def _cron_create_invoices(self, limit=5000):
+        """Invoice confirmed visits that have no invoice yet, oldest first."""
+        visits = self.search([
+            ('state', '=', 'confirmed'),
+            ('invoice_ids', '=', False),
+            ('owner_id.partner_id', '!=', False),
+        ], order='date asc, id asc', limit=limit)
+        visits._create_invoices(raise_on_error=False)
 
     def action_pay_invoice(self):
         self.ensure_one()
@@ -539,67 +598,108 @@ class VetAnimalVisit(models.Model):
             "context": {"default_visit_id": self.id},
         }
 
+    def _get_delivery_locations(self):
+        warehouse = self.env.user._get_default_warehouse_id()
+        if not warehouse:
+            raise UserError(_("Please set a default warehouse in your user preferences."))
+        dest_location = self.env.ref('stock.stock_location_customers', raise_if_not_found=False)
+        if not dest_location:
+            _logger.warning("stock.stock_location_customers not found; using default dest location.")
+        return warehouse, dest_location.id if dest_location else False
+
+    @instrumented('vet.animal.visit.deliver_vaccines')
     def action_deliver_vaccines(self):
-        StockPicking = self.env['stock.picking']
-        StockMove = self.env['stock.move']
-        StockMoveLine = self.env['stock.move.line']
+        """Deliver the vaccines of all undelivered visits in self.
+
+        Visits are grouped into one picking per owner; pickings, moves and move
+        lines are each created with a single multi-create and the whole batch is
+        confirmed, reserved and validated together.
+        """
+        visits = self.filtered(lambda v: not v.delivered)
+        if not visits:
+            return True
 
-        for visit in self:
-            if visit.delivered:
+        warehouse, dest_location = self._get_delivery_locations()
+        picking_type = warehouse.out_type_id
+        source_location = warehouse.lot_stock_id.id
+
+        # partner id -> {'visits': recordset, 'lines': [(visit line, product)]}
+        groups = {}
+        for visit in visits:
+            deliverable = [
+                (vline, vline.service_id.product_id)
+                for vline in visit.medicine_line_ids
+                if vline.service_id.product_id.type in ('product', 'consu')
+            ]
+            if not deliverable:
                 continue
-            origin = f"Visit {visit.name}"
-            warehouse = self.env.user._get_default_warehouse_id()
-            if not warehouse:
-                raise UserError(_("Please set a default warehouse in your user preferences."))
-            picking_type = warehouse.out_type_id
-            try:
-                dest_location = self.env.ref('stock.stock_location_customers').id
-            except Exception:
-                dest_location = False
-                _logger.warning("stock.stock_location_customers not found; using default dest location.")
-
-            picking = StockPicking.create({
-                'picking_type_id': picking_type.id,
-                'location_id': warehouse.lot_stock_id.id,
-                'location_dest_id': dest_location,
-                'origin': origin,
-                'partner_id': visit.owner_id and visit._get_or_create_partner_from_owner(visit.owner_id).id or False,
-            })
+            partner_id = visit.owner_id and visit._get_or_create_partner_from_owner(visit.owner_id).id or False
+            group = groups.setdefault(partner_id, {'visits': self.browse(), 'lines': []})
+            group['visits'] |= visit
+            group['lines'] += deliverable
 
-            moves_to_process = []
-            for vline in visit.medicine_line_ids:
-                product = vline.service_id.product_id
-                if not product or product.type not in ('product', 'consu'):
-                    continue
-                move = StockMove.create({
+        if not groups:
+            return True
+
+        pickings = self.env['stock.picking'].create([{
+            'picking_type_id': picking_type.id,
+            'location_id': source_location,
+            'location_dest_id': dest_location,
+            'origin': ", ".join(f"Visit {name}" for name in group['visits'].mapped('name')),
+            'partner_id': partner_id,
+        } for partner_id, group in groups.items()])
+
+        move_vals, move_lines = [], []
+        for picking, group in zip(pickings, groups.values()):
+            for vline, product in group['lines']:
+                move_vals.append({
                     'name': product.display_name,
                     'product_id': product.id,
                     'product_uom_qty': vline.quantity,
                     'product_uom': product.uom_id.id,
                     'picking_id': picking.id,
-                    'location_id': picking.location_id.id,
-                    'location_dest_id': picking.location_dest_id.id,
-                })
-                StockMoveLine.create({
-                    'move_id': move.id,
-                    'picking_id': picking.id,
-                    'product_id': product.id,
-                    'product_uom_id': product.uom_id.id,
-                    'qty_done': vline.quantity,
-                    'location_id': picking.location_id.id,
+                    'location_id': source_location,
                     'location_dest_id': picking.location_dest_id.id,
+                    'picked': True,
                 })
-                moves_to_process.append(move)
-
-            if moves_to_process:
-                picking.action_confirm()
-                picking.action_assign()
-                picking.button_validate()
-                visit.delivered = True
-                for line in visit.medicine_line_ids:
-                    line.delivered = True
-            else:
-                picking.unlink()
+                move_lines.append(vline)
+        moves = self.env['stock.move'].create(move_vals)
+        self.env['stock.move.line'].create([{
+            'move_id': move.id,
+            'picking_id': move.picking_id.id,
+            'product_id': move.product_id.id,
+            'product_uom_id': move.product_uom.id,
+            'quantity': vline.quantity,
+            'picked': True,
+            'location_id': move.location_id.id,
+            'location_dest_id': move.location_dest_id.id,
+        } for move, vline in zip(moves, move_lines)])
+
+        pickings.action_confirm()
+        pickings.action_assign()
+        pickings._action_done()
+
+        delivered_visits = self.browse()
+        for group in groups.values():
+            delivered_visits |= group['visits']
+        delivered_visits.with_context(skip_visit_validation=True).write({'delivered': True})
+        delivered_visits.medicine_line_ids.write({'delivered': True})
+        _logger.info("Delivered vaccines for %s visits in %s pickings", len(delivered_visits), len(pickings))
+        return True
+
+    @api.model
+    def _cron_deliver_vaccines(self, day=None):
+        """Deliver vaccines for every undelivered visit of the given day (default: today)."""
+        day = fields.Date.to_date(day) if day else fields.Date.context_today(self)
+        start = fields.Datetime.to_datetime(day)
+        visits = self.search([
+            ('delivered', '=', False),
+            ('state', '!=', 'cancel'),
+            ('date', '>=', start),
+            ('date', '<', start + timedelta(days=1)),
+            ('medicine_line_ids', '!=', False),
+        ])
+        return visits.action_deliver_vaccines()
 
     def action_view_invoices(self):
         self.ensure_one()
@@ -635,7 +735,7 @@ class VetAnimalVisit(models.Model):
             self.animal_name = self.selected_animal_id
             self.owner_id = self.selected_animal_id.owner_id
             self.contact_number = self.selected_animal_id.owner_id.contact_number or ''
-            self.animal_ids = self.env['vet.animal'].search([('owner_id', '=', self.owner_id.id)])
+            self.animal_ids = self._resolve_reception(owner_id=self.owner_id.id)[1]
         else:
             self.animal_id = False
             self.animal_name = ''
@@ -692,40 +792,6 @@ class VetAnimal(models.Model):
 
 
 
-    def name_get(self):
-        result = []
-        for animal in self:
-            parts = []
-            if animal.microchip_no:
-                parts.append(f"#{animal.microchip_no}")
-            if animal.name:
-                parts.append(animal.name)
-            if animal.owner_id:
-                parts.append(f"Owner: {animal.owner_id.name}")
-                if animal.owner_id.contact_number:
-                    parts.append(f"Phone: {animal.owner_id.contact_number}")
-            display = " | ".join(parts)
-            result.append((animal.id, display))
-        return result
-
-    @api.model
-    def name_search(self, name='', args=None, operator='ilike', limit=100):
-        args = args or []
-        name = (name or '').strip()
-        if not name:
-            return self.search(args, limit=limit).name_get()
-        if name.startswith('#'):
-            chip = name[1:].strip()
-            domain = [('microchip_no', '=', chip)]
-        else:
-            domain = ['|', ('microchip_no', operator, name), ('name', operator, name)]
-        try:
-            records = self.search(domain + args, limit=limit)
-            return records.name_get()
-        except Exception as exc:
-            _logger.exception("vet.animal.name_search failed: %s", exc)
-            return []
-
     def action_view_invoices(self):
         self.ensure_one()
         return {
@@ -762,6 +828,7 @@ class VetAnimalVisitPaymentWizard(models.TransientModel):
     )
     amount = fields.Float(string="Amount", required=True)
 
+    @instrumented('vet.animal.visit.confirm_payment')
     def action_confirm_payment(self):
         """Register payment for the visit invoice(s) using Odoo 18 standard receipts,
         update latest payment amount, handle receipt generation, and update visit state."""
@@ -857,11 +924,6 @@ class VetAnimalVisitPaymentWizard(models.TransientModel):
 
         # 6️⃣ Update visit payment state, amount received, and status
         if visit.exists():
-            visit.invalidate_recordset(['payment_state', 'is_fully_paid', 'amount_received'])
-
-            visit._sync_state_with_payment()
-
-
             _logger.info(
                 "Visit %s: State=%s, payment_state=%s, is_fully_paid=%s, amount_received=%s",
                 visit.name, visit.state, visit.payment_state, visit.is_fully_paid, visit.amount_received
@@ -907,12 +969,53 @@ class ReportVisitReceipt(models.AbstractModel):
     _name = 'report.vet_new.report_visit_receipt'
     _description = 'Visit Receipt Report'
 
+    # Same order as VetAnimalVisit.receipt_lines: services, tests, then medicines
+    _RECEIPT_LINE_TYPES = ('service', 'test', 'vaccine')
+
     @api.model
+    def _get_receipt_payload(self, docs):
+        """Build everything the receipt template needs for all docs at once.
+
+        Related records are reached through recordsets that share docs' prefetch
+        set, so the number of queries does not grow with the number of visits.
+        """
+        lines = self.env['vet.animal.visit.line'].search([
+            ('visit_id', 'in', docs.ids),
+            ('service_type', 'in', list(self._RECEIPT_LINE_TYPES)),
+            ('quantity', '>', 0),
+            ('product_id', '!=', False),
+        ], order='visit_id, id')
+        lines_by_visit = {}
+        for line in sorted(lines, key=lambda l: self._RECEIPT_LINE_TYPES.index(l.service_type)):
+            lines_by_visit.setdefault(line.visit_id.id, []).append({
+                'name': line.product_id.display_name or line.service_id.name or 'Service',
+                'quantity': line.quantity,
+                'subtotal': line.subtotal or 0.0,
+            })
+
+        payload = {}
+        for doc in docs:
+            animal = doc.animal_id
+            owner = doc.owner_id
+            payload[doc.id] = {
+                'doctor_name': doc.doctor_id.name,
+                'animal_name': animal.name,
+                'microchip_no': animal.microchip_no,
+                'owner_name': owner.name,
+                'contact_number': owner.contact_number,
+                'lines': lines_by_visit.get(doc.id, []),
+                'amount_received': doc.latest_payment_amount or 0.0,
+                'owner_unpaid_balance': owner.partner_id.vet_unpaid_amount or 0.0,
+            }
+        return payload
+
+    @api.model
+    @instrumented('report.visit_receipt', rows=lambda self, args, result: len(result.get('docs', ())))
     def _get_report_values(self, docids, data=None):
         docs = self.env['vet.animal.visit'].browse(docids)
         return {
             'doc_ids': docs.ids,
             'doc_model': 'vet.animal.visit',
             'docs': docs,
+            'receipts': self._get_receipt_payload(docs),
         }
-
@@ -0,0 +1,106 @@
+from odoo import api, fields, models, tools
+
+from .vet_dashboard import _drop_relation
+
+
+class VetOwnerAging(models.Model):
+    """Receivable aging per owner, as of the last daily refresh.
+
+    A materialized view built with one grouped pass over open customer
+    entries, joined to owners and their visits; the daily cron refreshes it
+    so reads never aggregate account_move again.
+    """
+    _name = "vet.owner.aging"
+    _description = "Owner Receivable Aging"
+    _auto = False
+    _order = "total_due desc"
+    _rec_name = "owner_id"
+
+    owner_id = fields.Many2one('vet.animal.owner', string="Owner", readonly=True)
+    partner_id = fields.Many2one('res.partner', string="Contact", readonly=True)
+    contact_number = fields.Char(string="Contact Number", readonly=True)
+    invoice_count = fields.Integer(string="Open Invoices", readonly=True)
+    oldest_due_date = fields.Date(string="Oldest Due Date", readonly=True)
+    last_visit_date = fields.Datetime(string="Last Visit", readonly=True)
+    visit_count = fields.Integer(string="Visits", readonly=True)
+    due_current = fields.Float(string="Current", readonly=True, digits=(16, 2))
+    due_1_30 = fields.Float(string="1-30 Days", readonly=True, digits=(16, 2))
+    due_31_60 = fields.Float(string="31-60 Days", readonly=True, digits=(16, 2))
+    due_61_90 = fields.Float(string="61-90 Days", readonly=True, digits=(16, 2))
+    due_90_plus = fields.Float(string="90+ Days", readonly=True, digits=(16, 2))
+    total_due = fields.Float(string="Total Due", readonly=True, digits=(16, 2))
+    report_date = fields.Date(string="As Of", readonly=True)
+
+    def init(self):
+        cr = self._cr
+        table = self._table
+        _drop_relation(cr, table)
+        cr.execute(f"""
+            CREATE MATERIALIZED VIEW {table} AS (
+                WITH open_items AS (
+                    SELECT
+                        m.partner_id,
+                        COUNT(*) AS invoice_count,
+                        MIN(COALESCE(m.invoice_date_due, m.invoice_date)) AS oldest_due_date,
+                        SUM(m.amount_residual_signed) FILTER (
+                            WHERE CURRENT_DATE - COALESCE(m.invoice_date_due, m.invoice_date) <= 0) AS due_current,
+                        SUM(m.amount_residual_signed) FILTER (
+                            WHERE CURRENT_DATE - COALESCE(m.invoice_date_due, m.invoice_date) BETWEEN 1 AND 30) AS due_1_30,
+                        SUM(m.amount_residual_signed) FILTER (
+                            WHERE CURRENT_DATE - COALESCE(m.invoice_date_due, m.invoice_date) BETWEEN 31 AND 60) AS due_31_60,
+                        SUM(m.amount_residual_signed) FILTER (
+                            WHERE CURRENT_DATE - COALESCE(m.invoice_date_due, m.invoice_date) BETWEEN 61 AND 90) AS due_61_90,
+                        SUM(m.amount_residual_signed) FILTER (
+                            WHERE CURRENT_DATE - COALESCE(m.invoice_date_due, m.invoice_date) > 90) AS due_90_plus,
+                        SUM(m.amount_residual_signed) AS total_due
+                    FROM account_move m
+                    WHERE m.move_type IN ('out_invoice', 'out_refund')
+                      AND m.state = 'posted'
+                      AND m.payment_state IN ('not_paid', 'partial')
+                      AND m.partner_id IS NOT NULL
+                    GROUP BY m.partner_id
+                ),
+                visits AS (
+                    SELECT owner_id, COUNT(*) AS visit_count, MAX(date) AS last_visit_date
+                    FROM vet_animal_visit
+                    WHERE owner_id IS NOT NULL
+                    GROUP BY owner_id
+                )
+                SELECT
+                    o.id AS id,
+                    o.id AS owner_id,
+                    o.partner_id,
+                    o.contact_number,
+                    i.invoice_count::integer AS invoice_count,
+                    i.oldest_due_date,
+                    v.last_visit_date,
+                    COALESCE(v.visit_count, 0)::integer AS visit_count,
+                    COALESCE(i.due_current, 0) AS due_current,
+                    COALESCE(i.due_1_30, 0) AS due_1_30,
+                    COALESCE(i.due_31_60, 0) AS due_31_60,
+                    COALESCE(i.due_61_90, 0) AS due_61_90,
+                    COALESCE(i.due_90_plus, 0) AS due_90_plus,
+                    i.total_due,
+                    CURRENT_DATE AS report_date
+                FROM open_items i
+                JOIN vet_animal_owner o ON o.partner_id = i.partner_id AND o.active
+                LEFT JOIN visits v ON v.owner_id = o.id
+                WHERE i.total_due != 0
+            )
+        """)
+        cr.execute(f"CREATE UNIQUE INDEX {table}_id_uniq ON {table} (id)")
+        tools.create_index(cr, f"{table}_total_due_idx", table, ["total_due DESC"])
+
+    @api.model
+    def _refresh(self):
+        self._cr.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {self._table}")
+        self.invalidate_model()
+
+    @api.model
+    def _cron_refresh(self):
+        self._refresh()
+
+    @api.model
+    def action_refresh(self):
+        self._refresh()
+        return {'type': 'ir.actions.client', 'tag': 'reload'}
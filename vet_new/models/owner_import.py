@@ -0,0 +1,196 @@
+import base64
+import csv
+import io
+import logging
+import re
+from itertools import islice
+
+from odoo import fields, models, _
+from odoo.exceptions import UserError
+
+from .animal_owner import normalize_phone
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Recognised column headers (lowercase) of the import file
+IMPORT_COLUMNS = (
+    'owner_name', 'phone', 'email', 'address',
+    'animal_name', 'species', 'gender', 'breed', 'dob',
+)
+
+
+class VetOwnerImportWizard(models.TransientModel):
+    _name = "vet.owner.import.wizard"
+    _description = "Import Owners and Animals"
+
+    file = fields.Binary(string="File", required=True)
+    filename = fields.Char(string="File Name")
+    chunk_size = fields.Integer(string="Rows per Chunk", default=2000)
+
+    state = fields.Selection([('draft', 'Draft'), ('done', 'Done')], default='draft')
+    owners_created = fields.Integer(string="Owners Created", readonly=True)
+    animals_created = fields.Integer(string="Animals Created", readonly=True)
+    error_count = fields.Integer(string="Rows with Errors", readonly=True)
+    error_log = fields.Text(string="Errors", readonly=True)
+
+    # -------------------------
+    # File reading
+    # -------------------------
+    def _iter_rows(self):
+        """Yield (row number, dict) for each data row of the uploaded file."""
+        data = base64.b64decode(self.file)
+        if (self.filename or '').lower().endswith('.xlsx'):
+            if openpyxl is None:
+                raise UserError(_("Reading XLSX files requires the openpyxl library."))
+            sheet = openpyxl.load_workbook(io.BytesIO(data), read_only=True).active
+            rows = sheet.iter_rows(values_only=True)
+        else:
+            rows = csv.reader(io.TextIOWrapper(io.BytesIO(data), encoding='utf-8-sig'))
+
+        header = next(rows, None)
+        if not header:
+            raise UserError(_("The file is empty."))
+        header = [str(col or '').strip().lower() for col in header]
+        missing = {'owner_name', 'phone', 'animal_name'} - set(header)
+        if missing:
+            raise UserError(_("Missing required columns: %s") % ", ".join(sorted(missing)))
+
+        for number, row in enumerate(rows, start=2):
+            values = {
+                col: (str(value).strip() if value is not None else '')
+                for col, value in zip(header, row) if col in IMPORT_COLUMNS
+            }
+            if any(values.values()):
+                yield number, values
+
+    # -------------------------
+    # Validation
+    # -------------------------
+    def _validate_row(self, values):
+        """Return the animal vals for a row, or raise ValueError with the reason."""
+        if not values.get('owner_name'):
+            raise ValueError(_("owner name is required"))
+        values['phone'] = normalize_phone(values.get('phone')) or ''
+        if not re.fullmatch(r'\d{11}', values['phone']):
+            raise ValueError(_("phone number must be exactly 11 digits"))
+        if not values.get('animal_name'):
+            raise ValueError(_("animal name is required"))
+
+        Animal = self.env['vet.animal']
+        animal_vals = {'name': values['animal_name'], 'breed': values.get('breed') or False}
+        for key in ('species', 'gender'):
+            value = (values.get(key) or '').lower()
+            if value:
+                allowed = [code for code, _label in Animal._fields[key].selection]
+                if value not in allowed:
+                    raise ValueError(_("%s must be one of %s") % (key, ", ".join(allowed)))
+                animal_vals[key] = value
+        if values.get('dob'):
+            try:
+                animal_vals['dob'] = fields.Date.to_date(values['dob'][:10])
+            except ValueError:
+                raise ValueError(_("dob must be a date (YYYY-MM-DD)"))
+        return animal_vals
+
+    # -------------------------
+    # Chunk processing
+    # -------------------------
+    def _import_chunk(self, rows, errors):
+        """Create partners, owners and animals for one chunk of rows.
+
+        Phones are checked against the database with one query for the whole
+        chunk: known phones reuse the existing owner (or create one for an
+        existing contact), new phones get a partner and an owner.
+        """
+        valid = []
+        for number, values in rows:
+            try:
+                valid.append((number, values, self._validate_row(values)))
+            except ValueError as e:
+                errors.append(_("Row %s: %s") % (number, e))
+        if not valid:
+            return 0, 0
+
+        phones = list({values['phone'] for _number, values, _vals in valid})
+        self.env['res.partner'].flush_model(['vet_phone_key'])
+        self.env['vet.animal.owner'].flush_model(['partner_id'])
+        self.env.cr.execute("""
+            SELECT p.vet_phone_key, p.id, o.id
+              FROM res_partner p
+         LEFT JOIN vet_animal_owner o ON o.partner_id = p.id
+             WHERE p.vet_phone_key IN %s
+          ORDER BY p.id, o.id
+        """, (tuple(phones),))
+        partner_by_phone, owner_by_phone = {}, {}
+        for phone, partner_id, owner_id in self.env.cr.fetchall():
+            partner_by_phone.setdefault(phone, partner_id)
+            if owner_id:
+                owner_by_phone.setdefault(phone, owner_id)
+
+        # First row of a phone in the chunk defines the owner's details
+        first_row = {}
+        for _number, values, _vals in valid:
+            first_row.setdefault(values['phone'], values)
+
+        new_phones = [phone for phone in first_row if phone not in partner_by_phone]
+        partners = self.env['res.partner'].with_context(skip_owner_create=True).create([{
+            'name': first_row[phone]['owner_name'],
+            'phone': phone,
+            'email': first_row[phone].get('email') or False,
+            'street': first_row[phone].get('address') or False,
+        } for phone in new_phones])
+        partner_by_phone.update(zip(new_phones, partners.ids))
+
+        ownerless_phones = [phone for phone in first_row if phone not in owner_by_phone]
+        owners = self.env['vet.animal.owner'].with_context(
+            skip_partner_create=True, vet_phone_uniqueness_checked=True,
+        ).create([{'partner_id': partner_by_phone[phone]} for phone in ownerless_phones])
+        owner_by_phone.update(zip(ownerless_phones, owners.ids))
+
+        animals = self.env['vet.animal'].create([
+            dict(animal_vals, owner_id=owner_by_phone[values['phone']])
+            for _number, values, animal_vals in valid
+        ])
+        return len(owners), len(animals)
+
+    def action_import(self):
+        self.ensure_one()
+        chunk_size = max(self.chunk_size or 2000, 1)
+        rows = self._iter_rows()
+        owners_created = animals_created = 0
+        errors = []
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            try:
+                with self.env.cr.savepoint():
+                    owners, animals = self._import_chunk(chunk, errors)
+            except Exception as e:
+                _logger.warning("Owner import: chunk starting at row %s failed: %s", chunk[0][0], e)
+                errors.append(_("Rows %s-%s: not imported (%s)") % (chunk[0][0], chunk[-1][0], e))
+                self.env.invalidate_all()
+                continue
+            owners_created += owners
+            animals_created += animals
+            _logger.info("Owner import: %s owners, %s animals created so far", owners_created, animals_created)
+
+        self.write({
+            'state': 'done',
+            'owners_created': owners_created,
+            'animals_created': animals_created,
+            'error_count': len(errors),
+            'error_log': "\n".join(errors) or False,
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'view_mode': 'form',
+            'res_id': self.id,
+            'target': 'new',
+        }
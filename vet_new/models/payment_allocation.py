@@ -0,0 +1,209 @@
+import logging
+from collections import defaultdict
+
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+from odoo.tools import float_compare, float_is_zero
+
+_logger = logging.getLogger(__name__)
+
+
+class VetPaymentAllocationWizard(models.TransientModel):
+    _name = "vet.payment.allocation.wizard"
+    _description = "End-of-Day Payment Allocation"
+
+    date = fields.Date(string="Payment Date", required=True, default=fields.Date.context_today)
+    line_ids = fields.One2many('vet.payment.allocation.line', 'wizard_id', string="Receipts")
+    currency_id = fields.Many2one('res.currency', default=lambda self: self.env.company.currency_id)
+
+    state = fields.Selection([('draft', 'Draft'), ('done', 'Done')], default='draft')
+    payment_count = fields.Integer(string="Payments Created", readonly=True)
+    total_received = fields.Monetary(string="Total Received", compute="_compute_totals")
+    total_allocated = fields.Monetary(string="Allocated to Invoices", compute="_compute_totals")
+    total_unallocated = fields.Monetary(string="Left as Customer Credit", compute="_compute_totals")
+    error_count = fields.Integer(string="Receipts with Errors", compute="_compute_totals")
+
+    @api.depends('line_ids.amount', 'line_ids.allocated_amount', 'line_ids.error')
+    def _compute_totals(self):
+        for wizard in self:
+            wizard.total_received = sum(wizard.line_ids.mapped('amount'))
+            wizard.total_allocated = sum(wizard.line_ids.mapped('allocated_amount'))
+            wizard.total_unallocated = wizard.total_received - wizard.total_allocated
+            wizard.error_count = len(wizard.line_ids.filtered('error'))
+
+    # -------------------------
+    # Allocation
+    # -------------------------
+    def _get_open_invoices(self, partners):
+        """Open customer invoices of the partners, oldest first, in one search."""
+        invoices = self.env['account.move'].search([
+            ('partner_id', 'in', partners.ids),
+            ('move_type', '=', 'out_invoice'),
+            ('state', '=', 'posted'),
+            ('payment_state', 'in', ['not_paid', 'partial']),
+        ], order='invoice_date asc, id asc')
+        by_partner = defaultdict(list)
+        for invoice in invoices:
+            by_partner[invoice.partner_id.id].append(invoice)
+        return by_partner
+
+    def _allocate_fifo(self, lines):
+        """Spread each receipt over its owner's open invoices, oldest first.
+
+        Receipts of the same owner consume the invoices in turn. Returns
+        {line: [(invoice, amount), ...]}.
+        """
+        invoices_by_partner = self._get_open_invoices(lines.owner_id.partner_id)
+        residual = {
+            invoice.id: invoice.amount_residual
+            for invoices in invoices_by_partner.values() for invoice in invoices
+        }
+        allocations = {}
+        for line in lines:
+            rounding = line.currency_id.rounding
+            remaining = line.amount
+            allocations[line] = []
+            for invoice in invoices_by_partner.get(line.owner_id.partner_id.id, []):
+                if float_is_zero(remaining, precision_rounding=rounding):
+                    break
+                if float_compare(residual[invoice.id], 0.0, precision_rounding=rounding) <= 0:
+                    continue
+                amount = min(remaining, residual[invoice.id])
+                residual[invoice.id] -= amount
+                remaining -= amount
+                allocations[line].append((invoice, amount))
+        return allocations
+
+    def _prepare_payment_vals(self, line):
+        partner = line.owner_id.partner_id
+        return {
+            'payment_type': 'inbound',
+            'partner_type': 'customer',
+            'partner_id': partner.id,
+            'amount': line.amount,
+            'journal_id': line.journal_id.id,
+            'date': self.date,
+            'memo': line.memo or _("End of day receipt - %s") % partner.name,
+        }
+
+    def _reconcile_allocations(self, allocations):
+        """Reconcile every payment with its allocated invoices in one plan."""
+        plan = []
+        for line, parts in allocations.items():
+            if not parts or not line.payment_id:
+                continue
+            invoice_lines = self.env['account.move.line'].concat(*[
+                invoice.line_ids for invoice, _amount in parts
+            ])
+            payment_lines = line.payment_id.move_id.line_ids
+            to_reconcile = (payment_lines | invoice_lines).filtered(
+                lambda l: l.account_id.account_type == 'asset_receivable' and not l.reconciled
+            )
+            if to_reconcile:
+                plan.append(to_reconcile)
+        if plan:
+            self.env['account.move.line']._reconcile_plan(plan)
+
+    def _process_journal(self, journal, lines, allocations):
+        """Create, post and reconcile the payments of one journal."""
+        payments = self.env['account.payment'].create([
+            self._prepare_payment_vals(line) for line in lines
+        ])
+        payments.action_post()
+        for line, payment in zip(lines, payments):
+            line.payment_id = payment
+        self._reconcile_allocations({line: allocations[line] for line in lines})
+
+    def _sync_visits(self, allocations):
+        """Record the allocated amount on each visit; states follow the invoices."""
+        amount_by_visit = defaultdict(float)
+        for parts in allocations.values():
+            for invoice, amount in parts:
+                if invoice.visit_id:
+                    amount_by_visit[invoice.visit_id] += amount
+        if not amount_by_visit:
+            return
+        visits_by_amount = defaultdict(lambda: self.env['vet.animal.visit'])
+        for visit, amount in amount_by_visit.items():
+            visits_by_amount[amount] |= visit
+        for amount, same_amount in visits_by_amount.items():
+            same_amount.with_context(skip_visit_validation=True).write({'latest_payment_amount': amount})
+
+    def action_allocate(self):
+        self.ensure_one()
+        if self.state == 'done':
+            raise UserError(_("These receipts have already been allocated."))
+        if not self.line_ids:
+            raise UserError(_("Add at least one receipt to allocate."))
+
+        self.line_ids.write({'error': False})
+        for line in self.line_ids:
+            if float_compare(line.amount, 0.0, precision_rounding=line.currency_id.rounding) <= 0:
+                line.error = _("Amount must be greater than zero.")
+            elif not line.owner_id.partner_id:
+                line.error = _("Owner has no linked contact.")
+        lines = self.line_ids.filtered(lambda l: not l.error)
+
+        allocations = self._allocate_fifo(lines)
+        lines_by_journal = defaultdict(lambda: self.env['vet.payment.allocation.line'])
+        for line in lines:
+            lines_by_journal[line.journal_id] |= line
+
+        done = {}
+        for journal, journal_lines in lines_by_journal.items():
+            try:
+                with self.env.cr.savepoint():
+                    self._process_journal(journal, journal_lines, allocations)
+            except Exception as e:
+                _logger.warning("Payment allocation failed for journal %s: %s", journal.name, e)
+                self.env.invalidate_all()
+                journal_lines.write({'error': _("Not posted: %s") % e, 'payment_id': False})
+                continue
+            done.update({line: allocations[line] for line in journal_lines})
+
+        for line, parts in done.items():
+            line.write({
+                'allocated_amount': sum(amount for _invoice, amount in parts),
+                'invoice_names': ", ".join(invoice.name for invoice, _amount in parts) or False,
+            })
+        self._sync_visits(done)
+        self.write({
+            'state': 'done',
+            'payment_count': len(done),
+        })
+        _logger.info("End of day allocation: %s payments posted over %s journal(s)",
+                     len(done), len(lines_by_journal))
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'view_mode': 'form',
+            'res_id': self.id,
+            'target': 'new',
+        }
+
+    def action_print_summary(self):
+        self.ensure_one()
+        return self.env.ref('vet_new.action_report_payment_allocation_summary').report_action(self)
+
+
+class VetPaymentAllocationLine(models.TransientModel):
+    _name = "vet.payment.allocation.line"
+    _description = "End-of-Day Payment Allocation Receipt"
+    _order = "id"
+
+    wizard_id = fields.Many2one('vet.payment.allocation.wizard', required=True, ondelete='cascade')
+    currency_id = fields.Many2one(related='wizard_id.currency_id')
+    owner_id = fields.Many2one('vet.animal.owner', string="Owner", required=True)
+    journal_id = fields.Many2one(
+        'account.journal',
+        string="Journal",
+        required=True,
+        domain="[('type', 'in', ('cash', 'bank'))]",
+    )
+    amount = fields.Monetary(string="Amount", required=True)
+    memo = fields.Char(string="Memo")
+
+    payment_id = fields.Many2one('account.payment', string="Payment", readonly=True)
+    allocated_amount = fields.Monetary(string="Allocated", readonly=True)
+    invoice_names = fields.Char(string="Invoices Paid", readonly=True)
+    error = fields.Char(string="Error", readonly=True)
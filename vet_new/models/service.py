@@ -1,4 +1,6 @@
-from odoo import models, fields, api
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from collections import defaultdict
 
 
 class VetService(models.Model):
@@ -19,6 +21,7 @@ class VetService(models.Model):
         ondelete="set null"
     )
     description = fields.Text("Description")
+    price_version_ids = fields.One2many('vet.service.price.version', 'service_id', string="Price History")
 
     # Helper: map vet.service.service_type → product.type
     def _map_service_type_to_product_config(self, service_type):
@@ -30,37 +33,78 @@ class VetService(models.Model):
         }
         return mapping.get(service_type, {'type': 'service', 'tracking': 'none'})
 
-    # Auto-create product if missing
-    @api.model
-    def create(self, vals):
-        if not vals.get('product_id'):
-            config = self._map_service_type_to_product_config(
-                vals.get('service_type', 'service')
+    # Auto-create missing products in one batch and start the price history
+    @api.model_create_multi
+    def create(self, vals_list):
+        missing = [vals for vals in vals_list if not vals.get('product_id')]
+        products = self.env['product.product'].create([
+            dict(
+                self._map_service_type_to_product_config(vals.get('service_type', 'service')),
+                name=vals.get('name'),
+                list_price=vals.get('price', 0),
             )
-            product_vals = {
-                'name': vals.get('name'),
-                'list_price': vals.get('price', 0),
-                'type': config['type'],
-                'tracking': config['tracking'],
-            }
-            product = self.env['product.product'].create(product_vals)
+            for vals in missing
+        ])
+        for vals, product in zip(missing, products):
             vals['product_id'] = product.id
-        return super().create(vals)
+        services = super().create(vals_list)
+        services._create_initial_price_versions()
+        return services
 
-    # Keep product in sync
+    def _create_initial_price_versions(self):
+        """Record the current price of services as the first entry of their history."""
+        return self.env['vet.service.price.version'].sudo().create([{
+            'service_id': service.id,
+            'price': service.price,
+            'date_from': service.create_date.date() if service.create_date else fields.Date.context_today(self),
+            'applied': True,
+        } for service in self])
+
+    # Keep products in sync with a single product write per call
     def write(self, vals):
         res = super().write(vals)
-        for service in self:
-            if service.product_id:
-                if 'price' in vals:
-                    service.product_id.list_price = service.price
-                if 'name' in vals:
-                    service.product_id.name = service.name
-                if 'service_type' in vals:
-                    config = self._map_service_type_to_product_config(service.service_type)
-                    service.product_id.type = config['type']
-                    service.product_id.tracking = config['tracking']
+        if not {'price', 'name', 'service_type'}.intersection(vals):
+            return res
+        product_vals = {}
+        if 'service_type' in vals:
+            product_vals.update(self._map_service_type_to_product_config(vals['service_type']))
+        if 'name' in vals:
+            product_vals['name'] = vals['name']
+        if 'price' in vals:
+            product_vals['list_price'] = vals['price']
+        self.filtered('product_id').product_id.write(product_vals)
+        if 'price' in vals and not self.env.context.get('skip_price_version'):
+            # Manual edits take effect today and are kept in the history;
+            # any user editing a service may record it
+            self.env['vet.service.price.version'].sudo().create([{
+                'service_id': service.id,
+                'price': vals['price'],
+                'applied': True,
+            } for service in self])
         return res
+
+    def _set_prices(self, price_by_service):
+        """Apply new prices; services and products are written once per distinct price."""
+        by_price = defaultdict(lambda: self.browse())
+        for service, price in price_by_service.items():
+            by_price[price] |= service
+        for price, services in by_price.items():
+            services.with_context(skip_price_version=True).write({'price': price})
+
+    def _price_on(self, date):
+        """Price in effect on date, from the price history, else the current price."""
+        self.ensure_one()
+        date = fields.Date.to_date(date) if date else fields.Date.context_today(self)
+        versions = self.price_version_ids  # ordered newest first
+        for version in versions:
+            if version.date_from <= date:
+                return version.price
+        # Dates before the recorded history get the oldest known price
+        applied = versions.filtered('applied')
+        if applied:
+            return applied[-1].price
+        return self.product_id.list_price if self.product_id else self.price
+
     @api.onchange('product_id')
     def _onchange_product_id(self):
         if self.product_id:
@@ -87,3 +131,109 @@ class VetService(models.Model):
             }
         }
 
+
+class VetServicePriceVersion(models.Model):
+    _name = "vet.service.price.version"
+    _description = "Vet Service Price Version"
+    _order = "service_id, date_from desc, id desc"
+
+    service_id = fields.Many2one('vet.service', string="Service", required=True, ondelete='cascade', index=True)
+    price = fields.Float("Price", required=True)
+    date_from = fields.Date("Effective From", required=True, default=fields.Date.context_today)
+    applied = fields.Boolean("Applied", readonly=True,
+                             help="Set once the price has been copied to the service and its product.")
+
+    def _apply_due_versions(self, today=None):
+        """Copy the versions that took effect by today onto their services.
+
+        Limited to the versions in self, or all pending versions when self is
+        empty (daily cron). Returns the number of services repriced.
+        """
+        today = today or fields.Date.context_today(self)
+        domain = [('applied', '=', False), ('date_from', '<=', today)]
+        if self:
+            domain.append(('id', 'in', self.ids))
+        versions = self.search(domain, order='service_id, date_from desc, id desc')
+        # Latest due version per service wins; older ones are superseded
+        latest = {}
+        for version in versions:
+            latest.setdefault(version.service_id, version.price)
+        self.env['vet.service'].browse()._set_prices(latest)
+        versions.write({'applied': True})
+        return len(latest)
+
+    @api.model
+    def _cron_apply_due_versions(self):
+        self._apply_due_versions()
+
+
+class VetServiceRepriceWizard(models.TransientModel):
+    _name = "vet.service.reprice.wizard"
+    _description = "Bulk Service Repricing"
+
+    service_type = fields.Selection([
+        ('service', 'Service'),
+        ('vaccine', 'Vaccine'),
+        ('test', 'Test')
+    ], string="Type", help="Leave empty to reprice every type.")
+    name_filter = fields.Char("Name Contains")
+    service_ids = fields.Many2many('vet.service', string="Services",
+                                   help="Leave empty to reprice every service matching the filters.")
+    method = fields.Selection([
+        ('percent', 'Percentage'),
+        ('fixed', 'Fixed Amount'),
+    ], string="Adjustment", required=True, default='percent')
+    value = fields.Float("Value", required=True,
+                         help="Percentage (e.g. 10 or -5) or amount added to the current price.")
+    date_from = fields.Date("Effective From", required=True, default=fields.Date.context_today)
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if self.env.context.get('active_model') == 'vet.service' and 'service_ids' in fields_list:
+            res['service_ids'] = [(6, 0, self.env.context.get('active_ids', []))]
+        return res
+
+    def _get_services(self):
+        if self.service_ids:
+            return self.service_ids
+        domain = []
+        if self.service_type:
+            domain.append(('service_type', '=', self.service_type))
+        if self.name_filter:
+            domain.append(('name', 'ilike', self.name_filter))
+        return self.env['vet.service'].search(domain)
+
+    def _new_price(self, price):
+        if self.method == 'percent':
+            price = price * (1 + self.value / 100.0)
+        else:
+            price = price + self.value
+        return max(round(price, 2), 0.0)
+
+    def action_apply(self):
+        self.ensure_one()
+        services = self._get_services()
+        if not services:
+            raise UserError(_("No service matches the filters."))
+        versions = self.env['vet.service.price.version'].create([{
+            'service_id': service.id,
+            'price': self._new_price(service.price),
+            'date_from': self.date_from,
+        } for service in services])
+        # Prices already in effect are applied now, later ones by the daily cron.
+        # Existing visit lines keep their stored price either way.
+        applied = versions._apply_due_versions()
+        scheduled = len(services) - applied
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Repricing"),
+                'message': _("%s service(s) repriced, %s scheduled from %s.") % (
+                    applied, scheduled, self.date_from) if scheduled
+                else _("%s service(s) repriced.") % applied,
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
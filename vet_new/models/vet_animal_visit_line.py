@@ -9,7 +9,9 @@ class VetAnimalVisitLine(models.Model):
     service_type = fields.Selection(related='service_id.service_type', store=True, readonly=True)
     visit_id = fields.Many2one('vet.animal.visit', string="Visit")
     quantity = fields.Float('Quantity', default=1.0)
-    price_unit = fields.Float('Unit Price', compute='_compute_price_unit', store=True)
+    # Snapshot of the service price at the visit date; later repricing never
+    # recomputes it, since it only depends on the service chosen on the line
+    price_unit = fields.Float('Unit Price', compute='_compute_price_unit', store=True, precompute=True)
     subtotal = fields.Float('Subtotal', compute='_compute_subtotal', store=True)
     line_type = fields.Selection([
         ('service', 'Service'),
@@ -24,10 +26,8 @@ class VetAnimalVisitLine(models.Model):
     @api.depends('service_id')
     def _compute_price_unit(self):
         for line in self:
-            if line.service_id and line.service_id.product_id:
-                line.price_unit = line.service_id.product_id.list_price
-            elif line.service_id:
-                line.price_unit = getattr(line.service_id, 'price', 0.0)
+            if line.service_id:
+                line.price_unit = line.service_id._price_on(line.visit_id.date)
             else:
                 line.price_unit = 0.0
 
@@ -0,0 +1,73 @@
+import functools
+import logging
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+PERF_PARAM = 'vet_new.perf_instrumentation'
+RETENTION_PARAM = 'vet_new.perf_retention_days'
+
+
+def instrumented(flow, rows=None):
+    """Record wall time, query count and rows of a call into vet.perf.stat.
+
+    Opt-in: does nothing unless the system parameter vet_new.perf_instrumentation
+    is set. rows(self, args, result) gives the number of records handled;
+    by default the size of the recordset the method is called on.
+    Apply below @api.model so the API decorator still sees the wrapper.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.env['ir.config_parameter'].sudo().get_param(PERF_PARAM):
+                return method(self, *args, **kwargs)
+            cr = self.env.cr
+            queries = cr.sql_log_count
+            start = time.perf_counter()
+            result = method(self, *args, **kwargs)
+            duration = (time.perf_counter() - start) * 1000.0
+            query_count = cr.sql_log_count - queries
+            count = rows(self, args, result) if rows else len(self)
+            self.env['vet.perf.stat']._record(flow, self._name, duration, query_count, count)
+            return result
+        return wrapper
+    return decorator
+
+
+class VetPerfStat(models.Model):
+    """Rolling log of instrumented vet_new calls.
+
+    Rows are inserted with one SQL statement in the caller's transaction and
+    purged by a daily cron after vet_new.perf_retention_days (default 14).
+    """
+    _name = "vet.perf.stat"
+    _description = "Vet Performance Sample"
+    _order = "id desc"
+    _log_access = False
+
+    date = fields.Datetime(string="Date", readonly=True, index=True)
+    flow = fields.Char(string="Flow", readonly=True, index=True)
+    model = fields.Char(string="Model", readonly=True)
+    user_id = fields.Many2one('res.users', string="User", readonly=True)
+    duration_ms = fields.Float(string="Duration (ms)", readonly=True, aggregator='avg')
+    query_count = fields.Integer(string="Queries", readonly=True, aggregator='avg')
+    record_count = fields.Integer(string="Records", readonly=True, aggregator='sum')
+    call_count = fields.Integer(string="Calls", readonly=True, default=1)
+
+    @api.model
+    def _record(self, flow, model, duration_ms, query_count, record_count):
+        self.env.cr.execute("""
+            INSERT INTO vet_perf_stat (date, flow, model, user_id, duration_ms, query_count, record_count, call_count)
+            VALUES (now() at time zone 'UTC', %s, %s, %s, %s, %s, %s, 1)
+        """, (flow, model, self.env.uid, duration_ms, query_count, record_count))
+        _logger.debug("%s: %.1f ms, %s queries, %s records", flow, duration_ms, query_count, record_count)
+
+    @api.model
+    def _cron_vacuum(self):
+        days = int(self.env['ir.config_parameter'].sudo().get_param(RETENTION_PARAM, 14))
+        limit = fields.Datetime.now() - timedelta(days=days)
+        self.env.cr.execute("DELETE FROM vet_perf_stat WHERE date < %s", (limit,))
+        _logger.info("Purged %s performance samples older than %s days", self.env.cr.rowcount, days)
@@ -0,0 +1,141 @@
+import logging
+from contextlib import contextmanager
+
+from odoo import api, fields, models, _
+from odoo.tools import str2bool
+
+_logger = logging.getLogger(__name__)
+
+DEFER_PARAM = 'vet_new.defer_rename_recompute'
+
+# Denormalized copies refreshed after an animal rename
+ANIMAL_RENAME_DEPENDENTS = (
+    ('vet.animal.visit', 'animal_display_name'),
+    ('account.move', 'animal_display_name'),
+)
+# Denormalized copies refreshed after a contact's phone change
+PARTNER_PHONE_DEPENDENTS = (
+    ('vet.animal.owner', 'contact_number'),
+    ('vet.animal', 'contact_number'),
+    ('vet.animal', 'display_label'),
+)
+
+
+class VetRecomputeQueue(models.Model):
+    """Stored fields whose recomputation was postponed to a background batch.
+
+    When deferral is on (system parameter vet_new.defer_rename_recompute, or
+    vet_defer_recompute in the context), renames and phone changes only queue
+    the dependent records; the cron recomputes them in chunks.
+    """
+    _name = "vet.recompute.queue"
+    _description = "Deferred Recompute"
+    _order = "id"
+    _log_access = False
+
+    model_name = fields.Char(string="Model", required=True, readonly=True)
+    field_name = fields.Char(string="Field", required=True, readonly=True)
+    res_id = fields.Integer(string="Record ID", required=True, readonly=True)
+    queued_at = fields.Datetime(string="Queued At", readonly=True)
+
+    _sql_constraints = [
+        ('record_field_uniq', 'unique(model_name, field_name, res_id)', 'This record is already queued.'),
+    ]
+
+    @api.model
+    def _is_deferral_enabled(self):
+        if 'vet_defer_recompute' in self.env.context:
+            return bool(self.env.context['vet_defer_recompute'])
+        return str2bool(self.env['ir.config_parameter'].sudo().get_param(DEFER_PARAM, 'False'))
+
+    @contextmanager
+    def _defer_dependents(self, targets):
+        """Queue instead of recompute the targets marked by the wrapped write.
+
+        Only records that became pending inside the block are taken out of the
+        ORM's recompute set, so earlier pending work (e.g. new records) is
+        still computed normally.
+        """
+        if not self._is_deferral_enabled():
+            yield
+            return
+        target_fields = [self.env[model]._fields[fname] for model, fname in targets]
+        before = {field: set(self.env.records_to_compute(field)._ids) for field in target_fields}
+        yield
+        rows = []
+        for field in target_fields:
+            records = self.env.records_to_compute(field)
+            new_ids = [rid for rid in records._ids if rid not in before[field] and isinstance(rid, int)]
+            if new_ids:
+                self.env.remove_to_compute(field, records.browse(new_ids))
+                rows += [(field.model_name, field.name, rid) for rid in new_ids]
+        if rows:
+            self._enqueue(rows)
+
+    @api.model
+    def _enqueue(self, rows):
+        for start in range(0, len(rows), 10000):
+            chunk = rows[start:start + 10000]
+            self.env.cr.execute(
+                "INSERT INTO vet_recompute_queue (model_name, field_name, res_id, queued_at) VALUES "
+                + ", ".join(["(%s, %s, %s, now() at time zone 'UTC')"] * len(chunk))
+                + " ON CONFLICT (model_name, field_name, res_id) DO NOTHING",
+                [value for row in chunk for value in row],
+            )
+        _logger.info("Deferred recomputation of %s stored values", len(rows))
+
+    @api.model
+    def _process(self, limit=50000, chunk_size=5000):
+        """Recompute up to limit queued values, chunk_size per flush.
+
+        All fields of a chunk are marked together so the ORM orders dependent
+        recomputations itself (owner phone before animal phone). Rows are
+        claimed with DELETE ... RETURNING before recomputing: a change queued
+        concurrently waits for this transaction and then inserts a fresh row
+        instead of being absorbed by the one being processed.
+        """
+        cr = self.env.cr
+        done = 0
+        while done < limit:
+            cr.execute("""
+                DELETE FROM vet_recompute_queue
+                 WHERE id IN (SELECT id FROM vet_recompute_queue
+                               ORDER BY id LIMIT %s
+                                 FOR UPDATE SKIP LOCKED)
+             RETURNING model_name, field_name, res_id
+            """, (min(chunk_size, limit - done),))
+            rows = cr.fetchall()
+            if not rows:
+                break
+            ids_by_field = {}
+            for model_name, field_name, res_id in rows:
+                ids_by_field.setdefault((model_name, field_name), []).append(res_id)
+            for (model_name, field_name), res_ids in ids_by_field.items():
+                if model_name not in self.env or field_name not in self.env[model_name]._fields:
+                    continue
+                Model = self.env[model_name].with_context(active_test=False)
+                self.env.add_to_compute(Model._fields[field_name], Model.browse(res_ids).exists())
+            self.env.flush_all()
+            self.env.invalidate_all()
+            done += len(rows)
+        if done:
+            _logger.info("Recomputed %s deferred stored values", done)
+        return done
+
+    @api.model
+    def _cron_process(self):
+        self._process()
+
+    @api.model
+    def action_process_now(self):
+        count = self._process()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Deferred Recomputes"),
+                'message': _("%s queued value(s) recomputed.") % count,
+                'sticky': False,
+                'next': {'type': 'ir.actions.client', 'tag': 'reload'},
+            }
+        }
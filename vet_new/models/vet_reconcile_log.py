@@ -0,0 +1,32 @@
+from odoo import fields, models, _
+
+
+class VetReconcileLog(models.Model):
+    _name = "vet.reconcile.log"
+    _description = "Payment Reconciliation Failure"
+    _order = "create_date desc, id desc"
+
+    partner_id = fields.Many2one('res.partner', string="Partner", readonly=True, index=True)
+    account_id = fields.Many2one('account.account', string="Account", readonly=True)
+    payment_ids = fields.Many2many('account.payment', string="Payments", readonly=True)
+    line_count = fields.Integer(string="Journal Items", readonly=True)
+    error = fields.Text(string="Error", readonly=True)
+    resolved = fields.Boolean(string="Resolved", default=False)
+
+    def action_retry(self):
+        """Run the grouped reconciliation again for the logged payments."""
+        payments = self.filtered(lambda log: not log.resolved).payment_ids
+        failures = payments._reconcile_with_invoices()
+        failed = {(f['partner_id'], f['account_id']) for f in failures}
+        self.filtered(lambda log: (log.partner_id.id, log.account_id.id) not in failed).resolved = True
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _("Reconciliation"),
+                'message': _("%s group(s) still failing.") % len(failures) if failures
+                else _("All selected payments are reconciled."),
+                'sticky': False,
+                'next': {'type': 'ir.actions.act_window_close'},
+            }
+        }
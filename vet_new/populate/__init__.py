@@ -0,0 +1 @@
+from . import vet_clinic, vet_visit
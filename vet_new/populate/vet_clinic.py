@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+from odoo import fields, models
+from odoo.tools import populate
+
+# Half-hour appointment slots per doctor per day in populated schedules
+SLOTS_PER_DAY = 16
+
+
+class VetService(models.Model):
+    _inherit = "vet.service"
+    _populate_sizes = {'small': 20, 'medium': 100, 'large': 300}
+
+    def _populate_factories(self):
+        return [
+            ('name', populate.constant('Service {counter}')),
+            ('service_type', populate.iterate(['service', 'test', 'vaccine'], [0.5, 0.2, 0.3])),
+            ('price', populate.randfloat(10, 300)),
+        ]
+
+
+class VetAnimalDoctor(models.Model):
+    _inherit = "vet.animal.doctor"
+    _populate_sizes = {'small': 5, 'medium': 20, 'large': 100}
+
+    def _populate_factories(self):
+        offset = self.with_context(active_test=False).search_count([])
+        return [
+            ('name', populate.constant('Dr. {counter}')),
+            ('contact_number', populate.compute(lambda counter, **kwargs: '0311%07d' % (offset + counter))),
+            ('specialization', populate.iterate(['General Practice', 'Surgery', 'Dermatology', 'Dentistry'])),
+        ]
+
+
+class VetAnimalOwner(models.Model):
+    _inherit = "vet.animal.owner"
+    _populate_sizes = {'small': 100, 'medium': 5000, 'large': 200000}
+
+    def _populate_factories(self):
+        # Phone numbers must be unique 11-digit keys, so continue after existing owners
+        offset = self.with_context(active_test=False).search_count([])
+        return [
+            ('name', populate.constant('Owner {counter}')),
+            ('contact_number', populate.compute(lambda counter, **kwargs: '0301%07d' % (offset + counter))),
+            ('email', populate.iterate([False, 'owner{counter}@example.com'], [0.4, 0.6])),
+        ]
+
+
+class VetAnimal(models.Model):
+    _inherit = "vet.animal"
+    _populate_sizes = {'small': 200, 'medium': 12000, 'large': 500000}
+    _populate_dependencies = ['vet.animal.owner']
+
+    def _populate_factories(self):
+        owner_ids = self.env.registry.populated_models['vet.animal.owner']
+        # A third of the owners are multi-pet households taking 40% of the animals
+        households = owner_ids[:max(1, len(owner_ids) // 3)]
+        today = fields.Date.today()
+
+        def get_owner(random=None, **kwargs):
+            return random.choice(households if random.random() < 0.4 else owner_ids)
+
+        def get_dob(random=None, **kwargs):
+            return today - timedelta(days=random.randint(30, 15 * 365))
+
+        return [
+            ('name', populate.constant('Pet {counter}')),
+            ('owner_id', populate.compute(get_owner)),
+            ('species', populate.iterate(['dog', 'cat', 'other'], [0.55, 0.35, 0.1])),
+            ('gender', populate.randomize(['male', 'female'])),
+            ('breed', populate.iterate([False, 'Mixed', 'Labrador', 'Persian', 'German Shepherd', 'Siamese'])),
+            ('dob', populate.compute(get_dob)),
+        ]
+
+
+class VetAnimalSchedule(models.Model):
+    _inherit = "vet.animal.schedule"
+    _populate_sizes = {'small': 200, 'medium': 10000, 'large': 200000}
+    _populate_dependencies = ['vet.animal', 'vet.animal.doctor']
+
+    def _populate_factories(self):
+        animal_ids = self.env.registry.populated_models['vet.animal']
+        doctor_ids = self.env.registry.populated_models['vet.animal.doctor']
+        # Doctors take turns over consecutive half-hour slots, so no doctor is
+        # ever double booked and the overlap constraint holds.
+        first_day = datetime.combine(fields.Date.today() - timedelta(days=180), datetime.min.time())
+
+        def get_start(counter=0, **kwargs):
+            slot = counter // len(doctor_ids)
+            return first_day + timedelta(days=slot // SLOTS_PER_DAY, hours=8, minutes=30 * (slot % SLOTS_PER_DAY))
+
+        return [
+            ('name', populate.constant('APT/{counter}')),
+            ('animal_id', populate.compute(lambda counter=0, **kwargs: animal_ids[counter % len(animal_ids)])),
+            ('doctor_id', populate.compute(lambda counter=0, **kwargs: doctor_ids[counter % len(doctor_ids)])),
+            ('start_datetime', populate.compute(get_start)),
+            ('duration', populate.constant(0.5)),
+            ('status', populate.iterate(
+                ['draft', 'confirmed', 'completed', 'cancelled'], [0.1, 0.3, 0.5, 0.1])),
+            ('reason', populate.iterate([False, 'Routine checkup', 'Vaccination', 'Follow-up'])),
+        ]
@@ -0,0 +1,98 @@
+import logging
+from datetime import timedelta
+
+from odoo import fields, models
+from odoo.tools import populate, split_every
+
+_logger = logging.getLogger(__name__)
+
+# Visits invoiced and paid per batch while populating
+BILLING_BATCH = 1000
+
+
+class VetAnimalVisit(models.Model):
+    _inherit = "vet.animal.visit"
+    _populate_sizes = {'small': 500, 'medium': 50000, 'large': 2000000}
+    _populate_dependencies = ['vet.animal', 'vet.animal.doctor']
+
+    def _populate_factories(self):
+        animal_ids = self.env.registry.populated_models['vet.animal']
+        # One animal in five is a regular and gets half of the visits
+        regulars = animal_ids[:max(1, len(animal_ids) // 5)]
+        self.env.cr.execute("SELECT id, owner_id FROM vet_animal WHERE id IN %s", (tuple(animal_ids),))
+        owner_by_animal = dict(self.env.cr.fetchall())
+        now = fields.Datetime.now()
+
+        def get_animal(random=None, **kwargs):
+            return random.choice(regulars if random.random() < 0.5 else animal_ids)
+
+        def get_date(random=None, **kwargs):
+            return now - timedelta(days=random.randint(0, 3 * 365), minutes=random.randint(0, 600))
+
+        return [
+            ('animal_id', populate.compute(get_animal)),
+            ('owner_id', populate.compute(lambda values=None, **kwargs: owner_by_animal[values['animal_id']])),
+            ('doctor_id', populate.randomize(self.env.registry.populated_models['vet.animal.doctor'])),
+            ('date', populate.compute(get_date)),
+            ('discount_percent', populate.iterate([0.0, 5.0, 10.0], [0.85, 0.1, 0.05])),
+            ('notes', populate.iterate([False, 'Healthy', 'Needs follow-up'], [0.7, 0.2, 0.1])),
+        ]
+
+    def _populate_billing(self, visits):
+        """Invoice most populated visits and pay them fully, partially or not at all.
+
+        Payments go through the end-of-day allocation wizard, so each owner's
+        receipt is spread over their invoices oldest first, like at the desk.
+        """
+        random = populate.Random('vet_visit_billing')
+        journal = self.env['account.journal'].search([
+            ('type', '=', 'cash'), ('company_id', '=', self.env.company.id)
+        ], limit=1)
+        visit_ids = [visit_id for visit_id in visits.ids if random.random() < 0.85]
+        invoiced = paid = 0
+        for batch in split_every(BILLING_BATCH, visit_ids, self.browse):
+            batch = batch.filtered(lambda v: v.owner_id.partner_id and v.line_ids and not v.invoice_ids)
+            batch.with_context(skip_visit_validation=True).write({'state': 'confirmed'})
+            invoices = batch._create_invoices(raise_on_error=False)
+            invoiced += len(invoices)
+
+            receipts = []
+            for owner in batch.owner_id:
+                due = sum(invoices.filtered(lambda m: m.partner_id == owner.partner_id).mapped('amount_residual'))
+                outcome = random.random()
+                if not due or outcome >= 0.85:
+                    continue
+                amount = due if outcome < 0.6 else round(due * random.uniform(0.2, 0.8), 2)
+                receipts.append({'owner_id': owner.id, 'journal_id': journal.id, 'amount': amount})
+            if receipts and journal:
+                self.env['vet.payment.allocation.wizard'].create({
+                    'line_ids': [(0, 0, vals) for vals in receipts],
+                }).action_allocate()
+                paid += len(receipts)
+            self.env.flush_all()
+            self.env.invalidate_all()
+        _logger.info("Populated %s invoices and %s owner payments", invoiced, paid)
+
+
+class VetAnimalVisitLine(models.Model):
+    _inherit = "vet.animal.visit.line"
+    _populate_sizes = {'small': 1500, 'medium': 150000, 'large': 6000000}
+    _populate_dependencies = ['vet.animal.visit', 'vet.service']
+
+    def _populate_factories(self):
+        service_ids = self.env.registry.populated_models['vet.service']
+        services = self.env['vet.service'].browse(service_ids)
+        type_by_service = {service.id: service.service_type for service in services}
+
+        return [
+            ('visit_id', populate.randomize(self.env.registry.populated_models['vet.animal.visit'])),
+            ('service_id', populate.randomize(service_ids)),
+            ('line_type', populate.compute(lambda values=None, **kwargs: type_by_service[values['service_id']])),
+            ('quantity', populate.iterate([1.0, 2.0, 3.0], [0.8, 0.15, 0.05])),
+        ]
+
+    def _populate(self, size):
+        records = super()._populate(size)
+        # Billing needs the visit lines, so it runs once they exist
+        self.env['vet.animal.visit']._populate_billing(records.visit_id)
+        return records
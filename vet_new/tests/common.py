@@ -0,0 +1,120 @@
+import itertools
+
+from odoo import Command
+from odoo.addons.account.tests.common import AccountTestInvoicingCommon
+
+# Dataset sizes every flow is measured at
+SIZES = (1, 10, 100)
+
+# Extra queries any larger run may cost over the smallest one: budget(n) = baseline + slack
+SET_BASED = 5
+# Flows that create one account.move or stock.picking per record go through
+# core posting/validation, which batches the documents but groups some work
+# (sequences, reconciliation, quants) into a bounded number of extra queries
+DOCUMENT_BATCH = 25
+
+_phone_counter = itertools.count(1)
+
+
+class VetPerformanceCommon(AccountTestInvoicingCommon):
+    """Fixtures and a query-scaling assertion for the vet_new benchmarks."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.doctor = cls.env['vet.animal.doctor'].create({
+            'name': 'Dr. Perf',
+            'contact_number': '09990000000',
+        })
+        income_account = cls.company_data['default_account_revenue']
+        products = cls.env['product.product'].create([{
+            'name': name,
+            'type': product_type,
+            'list_price': price,
+            'property_account_income_id': income_account.id,
+            'taxes_id': [Command.clear()],
+        } for name, product_type, price in (
+            ('Checkup', 'service', 50.0),
+            ('Blood Test', 'consu', 30.0),
+            ('Rabies Vaccine', 'consu', 20.0),
+        )])
+        cls.service, cls.test, cls.vaccine = (
+            cls.env['vet.service'].create({
+                'name': product.name,
+                'service_type': service_type,
+                'price': product.list_price,
+                'product_id': product.id,
+            })
+            for product, service_type in zip(products, ('service', 'test', 'vaccine'))
+        )
+        cls.cash_journal = cls.company_data['default_journal_cash']
+
+    # -------------------------
+    # Data builders
+    # -------------------------
+    def _next_phone(self):
+        return '0300%07d' % next(_phone_counter)
+
+    def _create_owners(self, count):
+        return self.env['vet.animal.owner'].create([{
+            'name': f'Owner {i}',
+            'contact_number': self._next_phone(),
+        } for i in range(count)])
+
+    def _create_animals(self, owners):
+        return self.env['vet.animal'].create([{
+            'name': f'Pet {i}',
+            'species': 'dog',
+            'owner_id': owner.id,
+        } for i, owner in enumerate(owners)])
+
+    def _visit_line_commands(self):
+        return [
+            Command.create({'service_id': self.service.id, 'line_type': 'service', 'quantity': 1}),
+            Command.create({'service_id': self.test.id, 'line_type': 'test', 'quantity': 1}),
+            Command.create({'service_id': self.vaccine.id, 'line_type': 'vaccine', 'quantity': 1}),
+        ]
+
+    def _create_visits(self, animals, confirmed=True):
+        visits = self.env['vet.animal.visit'].create([{
+            'animal_id': animal.id,
+            'owner_id': animal.owner_id.id,
+            'doctor_id': self.doctor.id,
+            'line_ids': self._visit_line_commands(),
+        } for animal in animals])
+        if confirmed:
+            visits.write({'state': 'confirmed'})
+        return visits
+
+    def _create_invoiced_visits(self, animals):
+        visits = self._create_visits(animals)
+        visits.action_create_invoice()
+        return visits
+
+    # -------------------------
+    # Assertions
+    # -------------------------
+    def assertQueriesScale(self, prepare, slack=SET_BASED, sizes=SIZES):
+        """Assert a flow costs the same number of queries at every size.
+
+        prepare(n) builds a dataset of size n and returns a callable running
+        the flow under test. The smallest size, measured after one warm-up run
+        so ormcaches are filled, gives the baseline; every larger size must
+        stay within assertQueryCount(baseline + slack). The budget does not
+        grow with n, so an N+1 of even one query per record fails at n=100.
+        """
+        prepare(sizes[0])()
+        baseline = None
+        for size in sizes:
+            flow = prepare(size)
+            self.env.flush_all()
+            self.env.invalidate_all()
+            if baseline is None:
+                start = self.env.cr.sql_log_count
+                flow()
+                self.env.flush_all()
+                baseline = self.env.cr.sql_log_count - start
+                continue
+            budget = baseline + slack
+            with self.subTest(size=size), self.assertQueryCount(budget):
+                flow()
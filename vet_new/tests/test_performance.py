@@ -0,0 +1,75 @@
+from odoo.tests import tagged
+
+from .common import DOCUMENT_BATCH, VetPerformanceCommon
+
+
+@tagged('post_install', '-at_install', 'vet_perf')
+class TestVetQueryCounts(VetPerformanceCommon):
+    """N+1 guards: each flow runs at 1, 10 and 100 records."""
+
+    def test_owner_and_animal_creation(self):
+        def prepare(size):
+            def flow():
+                owners = self._create_owners(size)
+                self._create_animals(owners)
+            return flow
+        self.assertQueriesScale(prepare)
+
+    def test_visit_creation_with_mixed_lines(self):
+        def prepare(size):
+            animals = self._create_animals(self._create_owners(size))
+            return lambda: self._create_visits(animals, confirmed=False)
+        self.assertQueriesScale(prepare)
+
+    def test_create_invoice(self):
+        def prepare(size):
+            visits = self._create_visits(self._create_animals(self._create_owners(size)))
+            return visits.action_create_invoice
+        self.assertQueriesScale(prepare, slack=DOCUMENT_BATCH)
+
+    def test_confirm_payment_with_owner_history(self):
+        # One payment per run; the owner's number of open invoices grows
+        def prepare(size):
+            owner = self._create_owners(1)
+            animal = self._create_animals(owner)
+            visits = self._create_invoiced_visits(animal.browse(animal.ids * size))
+            wizard = self.env['vet.animal.visit.payment.wizard'].create({
+                'visit_id': visits[-1].id,
+                'payment_method': 'cash',
+                'journal_id': self.cash_journal.id,
+                'amount': visits[-1].invoice_ids.amount_residual,
+            })
+            return wizard.action_confirm_payment
+        self.assertQueriesScale(prepare, slack=10)
+
+    def test_deliver_vaccines(self):
+        def prepare(size):
+            visits = self._create_visits(self._create_animals(self._create_owners(size)))
+            return visits.action_deliver_vaccines
+        self.assertQueriesScale(prepare, slack=DOCUMENT_BATCH)
+
+    def test_animal_name_search(self):
+        def prepare(size):
+            self._create_animals(self._create_owners(size))
+            return lambda: self.env['vet.animal'].name_search('Pet', limit=8)
+        self.assertQueriesScale(prepare)
+
+    def test_history_wizard(self):
+        # One page of history; the animal's number of visits grows
+        def prepare(size):
+            animal = self._create_animals(self._create_owners(1))
+            self._create_visits(animal.browse(animal.ids * size))
+            wizard = self.env['vet.animal.history.wizard'].create({'animal_id': animal.id, 'page_size': 50})
+
+            def flow():
+                wizard.action_search_history()
+                wizard.read(['visit_ids', 'total_visits', 'total_spent', 'doctor_summary', 'has_next_page'])
+            return flow
+        self.assertQueriesScale(prepare)
+
+    def test_visit_receipt_report(self):
+        def prepare(size):
+            visits = self._create_invoiced_visits(self._create_animals(self._create_owners(size)))
+            return lambda: self.env['ir.actions.report']._render_qweb_html(
+                'vet_new.action_report_visit_receipt', visits.ids)
+        self.assertQueriesScale(prepare)